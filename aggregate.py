@@ -0,0 +1,90 @@
+"""
+Kennzahlen und Diagramm für ein kategorisiertes Upload.
+
+Alle Aggregate (Anzahl, Anteil, Beispiel-Schnipsel je Kategorie) werden in
+einem Durchlauf über die Codes der kategorialen Spalte berechnet. Das
+Diagramm wird ohne pyplot-Zustand gerendert und als PNG-Bytes geliefert,
+damit es gecacht und bei Reruns ohne erneutes Zeichnen angezeigt werden kann.
+"""
+import io
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from matcher import FALLBACK_CATEGORY
+
+DEFAULT_EXAMPLES = 3
+SNIPPET_LENGTH = 120
+
+
+def category_order(rules: dict[str, list[str]]) -> list[str]:
+    """Kategorien in Regel-Reihenfolge, "Sonstiges" am Ende."""
+    return [*(c for c in rules if c != FALLBACK_CATEGORY), FALLBACK_CATEGORY]
+
+
+def as_categorical(labels, categories: list[str]) -> pd.Categorical:
+    """Kategorie-Spalte als Categorical (ein Byte pro Zeile statt eines Strings)."""
+    return pd.Categorical(labels, categories=categories)
+
+
+def _snippet(text: str, length: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= length else text[:length - 1] + "…"
+
+
+@dataclass
+class CategorySummary:
+    counts: pd.Series            # Anzahl je Kategorie, absteigend
+    shares: pd.Series            # Anteil in Prozent, gleiche Reihenfolge
+    examples: dict[str, list[str]]
+
+    def table(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Anzahl": self.counts,
+            "Anteil (%)": self.shares.round(1),
+            "Beispiele": [" | ".join(self.examples.get(c, [])) for c in self.counts.index],
+        })
+
+
+def summarize(labels: pd.Series, feedback: pd.Series, n_examples: int = DEFAULT_EXAMPLES,
+              snippet_length: int = SNIPPET_LENGTH) -> CategorySummary:
+    """Zählt je Kategorie und nimmt die ersten ``n_examples`` Texte als Beispiele."""
+    cat = labels.astype("category")
+    codes = cat.cat.codes.to_numpy()
+    names = list(cat.cat.categories)
+    counts = np.bincount(codes[codes >= 0], minlength=len(names))
+
+    # Erste Zeilen je Kategorie: stabile Sortierung nach Code, dann die ersten n je Gruppe
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    group_start = np.searchsorted(sorted_codes, np.arange(len(names)))
+    rank = np.arange(len(order)) - group_start[np.maximum(sorted_codes, 0)]
+    pick = order[(rank < n_examples) & (sorted_codes >= 0)]
+    texts = feedback.to_numpy()[pick]
+    examples: dict[str, list[str]] = {}
+    for code, text in zip(codes[pick], texts):
+        examples.setdefault(names[code], []).append(_snippet(text, snippet_length))
+
+    series = pd.Series(counts, index=pd.Index(names, name="Kategorie"), name="Anzahl")
+    series = series[series > 0].sort_values(ascending=False, kind="stable")
+    total = series.sum()
+    shares = (series / total * 100 if total else series.astype(float)).rename("Anteil (%)")
+    return CategorySummary(counts=series, shares=shares, examples=examples)
+
+
+def render_bar_chart(shares: pd.Series, title: str = "Verteilung der Kategorien", dpi: int = 110) -> bytes:
+    """Horizontales Balkendiagramm der Anteile als PNG."""
+    from matplotlib.figure import Figure  # ohne pyplot: kein globaler Zustand, threadsicher
+
+    data = shares.sort_values()
+    fig = Figure(figsize=(6.4, max(2.5, 0.28 * len(data) + 1.2)))
+    ax = fig.add_subplot()
+    ax.barh(data.index.astype(str), data.to_numpy())
+    ax.set_xlabel("Anteil (%)")
+    ax.set_ylabel("Kategorie")
+    ax.set_title(title)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi)
+    return buf.getvalue()
@@ -1,218 +1,46 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import json
+import numpy as np
 import datetime
 import hashlib
-import re
-import io
+import os
+import uuid
 from pathlib import Path
 
-# --- GitHub-Integration ---
-try:
-    from github import Github, GithubException
-except ImportError:
-    Github = None
-    GithubException = Exception
+import categorizer
+import export
+import github_sync
+from aggregate import as_categorical, category_order, render_bar_chart, summarize
+from categorizer import RULES_PATH, categorize_series
+from history import (FREQUENCIES, append_upload, category_trend, load_history, stored_date, upload_id,
+                     upload_summaries)
+from instrumentation import RunProfiler, StageMetrics
+from ingest import SUPPORTED_TYPES, estimate_rows, iter_chunks
+from learning import log_accepted, mine_candidates
+from matcher import RuleMatcher, RulesIndex
+from normalize import dedupe_texts, normalize_rules
+from parallel import shared_categorizer
+from result_cache import ResultCache, rules_hash
+from rule_coverage import TermIndex, analyze
 
+# --- GitHub-Integration ---
 # GitHub-Token und Repo-Name aus Secrets
 GITHUB_TOKEN = st.secrets.get("GITHUB_TOKEN")
 REPO_NAME    = st.secrets.get("REPO_NAME")  # Format: "user/repo"
+# Abweichende API-URL (GitHub Enterprise oder lokaler Fake: python fake_github.py)
+GITHUB_BASE_URL = st.secrets.get("GITHUB_BASE_URL")
+# Ruhephase in Sekunden, in der schnelle Speichervorgänge zu einem Commit gebündelt werden
+GITHUB_SYNC_DEBOUNCE = float(st.secrets.get("GITHUB_SYNC_DEBOUNCE", github_sync.DEFAULT_DEBOUNCE))
+
+# Anzahl Worker-Prozesse für die Kategorisierung (Default: alle Kerne). Bewusst
+# serverseitig: der Pool ist prozessweit und würde bei Werten pro Sitzung ständig neu gestartet
+WORKERS = int(st.secrets.get("WORKERS", os.environ.get("FEEDBACK_WORKERS", os.cpu_count() or 1)))
 
 # --- Pfade ---
 BASE_DIR    = Path(__file__).parent
-RULES_PATH  = BASE_DIR / "data" / "custom_rules.json"
 LOG_PATH    = BASE_DIR / "data" / "rule_log.csv"
-
-# --- Default-Regeln ---
-DEFAULT_RULES: dict[str, list[str]] = {
-    "Login": [
-        "einloggen", "login", "passwort", "anmeldung", "einloggen fehlgeschlagen", "nicht einloggen", "login funktioniert nicht",
-        "authentifizierung fehler", "probleme beim anmelden", "nicht angemeldet", "zugriff", "fehlermeldung", "konto", "abmeldung",
-        "kennwort", "verbindungsfehler", "sitzung", "anmeldedaten", "nutzerdaten", "loginversuch", "keine anmeldung möglich",
-        "probleme mit login", "passwort falsch", "kennwort zurücksetzen", "neues passwort", "loginseite", "loginfenster",
-        "verbindung fehlgeschlagen", "nicht authentifiziert", "anmeldung abgelehnt", "nutzerdaten ungültig", "app meldet fehler",
-        "einloggen unmöglich", "nicht mehr angemeldet", "verbindung wird getrennt", "sitzung beendet", "session läuft ab",
-        "fehlversuch login", "loginblockade"
-    ],
-    "TAN Probleme": [
-        "tan", "code", "authentifizierung", "bestätigungscode", "code kommt nicht", "tan nicht erhalten", "sms tan",
-        "tan eingabe", "problem mit tan", "keine tan bekommen", "tan ungültig", "tan feld fehlt", "neue tan", "tan abgelaufen",
-        "tan funktioniert nicht", "tan wird nicht akzeptiert", "falscher tan code", "keine tan sms", "tan verzögert", "push tan",
-        "photo tan", "mTAN", "secure tan", "tan app", "tan mail", "email tan", "keine tan gesendet", "2-faktor tan",
-        "tan bleibt leer", "probleme mit authentifizierung"
-    ],
-    "App abstürze": [
-        "absturz", "hängt", "app stürzt ab", "reagiert nicht", "crash", "app friert ein", "schließt sich", "hängt sich auf",
-        "abgestürzt", "beendet sich", "app hängt sich auf", "app schließt unerwartet", "fehler beim starten", "app startet nicht",
-        "startet nicht mehr", "app funktioniert nicht", "nichts passiert", "plötzlich beendet", "bleibt stehen", "app reagiert nicht",
-        "schwarzer bildschirm", "app lädt nicht", "absturz beim öffnen", "abbruch", "fehler beim öffnen", "startproblem",
-        "app bleibt hängen", "app hängt fest", "schließt nach start", "app stürzt ständig ab"
-    ],
-    "Fehler / Bugs": [
-        "fehler", "bug", "problem", "funktioniert nicht", "technischer fehler", "defekt", "störung", "anwendungsfehler",
-        "fehlerhaft", "problematisch", "systemfehler", "fehlermeldung", "appfehler", "softwareproblem", "ausnahmefehler",
-        "programmfehler", "fehleranzeige", "abbruchfehler", "nicht verfügbar", "error", "fehlfunktion", "nicht geladen",
-        "seitenfehler", "prozessfehler", "absturzmeldung", "stopp", "hänger", "service nicht erreichbar", "ladefehler",
-        "modulproblem"
-    ],
-    "Rückzahlungsoptionen": [
-        "rückzahlung", "raten", "tilgung", "zurückzahlen", "zahlung aufteilen", "zahlungspause", "rate ändern",
-        "tilgungsplan", "rückzahlung ändern", "ratenzahlung", "rückzahlungsplan", "abzahlungsoption", "zahlung stunden",
-        "zahlungsaufschub", "zahlung reduzieren", "monatsrate ändern", "zahlung anpassen", "flexible raten",
-        "anpassung rate", "kreditrückzahlung", "anzahlung", "zahlung verschieben", "abzahlungsdauer", "rückzahlungsart",
-        "zahlung in teilen", "verzögerung", "teilrückzahlung", "ablösung kredit", "rate pausieren", "rate aussetzen"
-    ],
-    "Zahlungsprobleme": [
-        "zahlung", "überweisung", "geld senden", "keine buchung", "zahlung funktioniert nicht", "zahlung fehlgeschlagen",
-        "nicht überwiesen", "nicht angekommen", "probleme mit zahlung", "überweisung hängt", "zahlung nicht möglich",
-        "zahlung abgelehnt", "konnte nicht zahlen", "buchung nicht durchgeführt", "fehlende zahlung", "problem mit lastschrift",
-        "banküberweisung gescheitert", "nicht gebucht", "zahlungsvorgang fehlerhaft", "betrag nicht abgebucht",
-        "zahlung wurde nicht verarbeitet", "lastschrift fehlgeschlagen", "überweisung nicht angekommen",
-        "zahlung nicht bestätigt", "abbuchung fehlt", "keine bestätigung", "geld nicht übertragen",
-        "buchung offen", "geld nicht gutgeschrieben", "fehlermeldung bei zahlung"
-    ],
-    "Kompliziert / Unklar": [
-        "kompliziert", "nicht verständlich", "nicht intuitiv", "schwer zu verstehen", "unklar", "nicht eindeutig",
-        "umständlich", "nicht nutzerfreundlich", "unverständlich", "verwirrend", "komplizierter vorgang",
-        "nicht nachvollziehbar", "nicht klar erklärt", "unlogisch", "verwirrende navigation", "menü unverständlich",
-        "unklare anleitung", "komplizierte beschreibung", "sperrig", "nicht selbsterklärend",
-        "nicht selbsterklärlich", "verwirrende benennung", "missverständlich", "komplexe struktur",
-        "kein roter faden", "nicht eindeutig beschrieben", "nicht eindeutig erklärt", "nicht selbsterklärende schritte",
-        "nicht klar gegliedert", "undurchsichtig"
-    ],
-    "Feature-Wünsche / Kritik": [
-        "funktion fehlt", "wäre gut", "feature", "nicht vorgesehen", "funktion sollte", "funktion benötigt",
-        "ich wünsche mir", "bitte ergänzen", "könnte man hinzufügen", "nicht verfügbar", "funktion nicht vorhanden",
-        "funktion deaktiviert", "fehlt in der app", "keine möglichkeit", "nicht vorgesehen", "nicht enthalten",
-        "noch nicht verfügbar", "sollte implementiert werden", "gewünschtes feature", "funktion vermisst",
-        "kein button", "nicht auswählbar", "keine option", "option fehlt", "nicht konfigurierbar",
-        "könnte verbessert werden", "wünschenswert", "funktion erweitern", "benutzerwunsch", "nicht freigeschaltet"
-    ],
-    "Sprachprobleme": [
-        "englisch", "nicht auf deutsch", "sprache falsch", "nur englisch", "kein deutsch",
-        "nicht lokalisiert", "übersetzung fehlt", "englische sprache", "sprache ändern",
-        "menü englisch", "texte nicht übersetzt", "nur englische version",
-        "übersetzungsfehler", "falsche sprache", "texte nicht verständlich",
-        "fehlende lokalisierung", "keine deutsche sprache", "falsche sprachversion",
-        "spracheinstellungen fehlen", "menü auf englisch", "fehlende übersetzung",
-        "sprachlich unklar", "kein sprachwechsel", "interface englisch",
-        "nicht auf deutsch verfügbar", "englischer hilfetext", "sprachumschaltung fehlt",
-        "keine lokalisierung", "fehlende sprachwahl", "hilfe nur englisch"
-    ],
-    "Sicherheit": [
-        "sicherheit", "schutz", "sicherheitsproblem", "datenleck", "nicht sicher", "unsicher",
-        "sicherheitsbedenken", "keine 2-faktor", "risiko", "zugriffsproblem",
-        "sicherheitslücke", "keine verschlüsselung", "unsichere verbindung",
-        "unsicherer zugang", "schutz fehlt", "keine passwortabfrage",
-        "fehlende sicherheit", "daten ungeschützt", "authentifizierung unklar",
-        "zugriff ohne sicherheit", "fehlender schutzmechanismus", "kein logout",
-        "automatischer logout fehlt", "keine warnmeldung", "sicherheitsmeldung fehlt",
-        "datenweitergabe", "keine session begrenzung", "session nicht gesichert",
-        "zugangsdaten unverschlüsselt", "zugriffsrechte unklar"
-    ],
-    "Tagesgeld": [
-        "tagesgeld", "zins", "geldanlage", "sparzins", "zinskonto", "zinsen fehlen",
-        "tagesgeldkonto", "keine verzinsung", "tagesgeldrate", "zinsbindung",
-        "verzinsung", "zinsänderung", "tagesgeldkonto nicht sichtbar",
-        "tagesgeld nicht auswählbar", "zins niedrig", "zinsangebot",
-        "anlagezins", "keine zinsinfo", "zins falsch angezeigt",
-        "tagesgeld fehler", "nicht verzinst", "zins fehlt",
-        "tagesgeldrate nicht geändert", "tagesgeldrate nicht angepasst",
-        "zinsbuchung fehlt", "zinsrate falsch", "zins wird nicht berechnet",
-        "tagesgeldkonto fehlt", "keine zinsanpassung", "tagesgeldoption fehlt"
-    ],
-    "Werbung": [
-        "werbung", "angebot", "promo", "aktionscode", "zu viel werbung",
-        "nerversige werbung", "nicht relevant", "spam", "werbeeinblendung",
-        "promotion", "werbeanzeige", "werbebanner", "werbebotschaft",
-        "unpassende werbung", "irrelevante werbung", "werbeaktion",
-        "werbung eingeblendet", "push werbung", "email werbung",
-        "werbung auf startseite", "nicht deaktivierbar", "werbung bei login",
-        "keine option zum abschalten", "störende werbung", "zu viele angebote",
-        "angebote nerven", "werbung in app", "werbung zu präsent",
-        "popup werbung", "unnötige angebote"
-    ],
-    "UI/UX": [
-        "veraltet", "nicht modern", "design alt", "nicht intuitiv",
-        "menüführung schlecht", "layout veraltet", "keine struktur",
-        "nicht übersichtlich", "nicht schön", "altbacken", "altmodisch",
-        "nicht benutzerfreundlich", "unübersichtliches layout",
-        "nicht ansprechend", "veraltetes interface", "kein modernes design",
-        "wirkt alt", "design nicht aktuell", "unmoderne oberfläche",
-        "technisch alt", "nicht responsive", "bedienung veraltet",
-        "style altbacken", "nutzung unkomfortabel", "umständliches layout",
-        "nicht ansehnlich", "elemente zu klein", "zu viel text", "keine icons",
-        "unpraktische darstellung"
-    ],
-    "unübersichtlich": [
-        "unübersichtlich", "nicht klar", "durcheinander", "nicht strukturiert",
-        "keine ordnung", "keine übersicht", "zu komplex", "schlecht aufgebaut",
-        "nicht nachvollziehbar", "layout chaotisch", "verwirrend",
-        "keine menüstruktur", "kein überblick", "unklare gliederung",
-        "unstrukturierte darstellung", "unübersichtliche seite",
-        "navigation schwierig", "kompliziertes menü", "kein roter faden",
-        "menüführung unklar", "fehlende kategorien", "kein filter",
-        "ohne sortierung", "unleserlich", "überladen", "optisch unklar",
-        "nicht gut erkennbar", "kategorie fehlt"
-    ],
-    "langsam": [
-        "langsam", "lädt lange", "dauert ewig", "träge", "reaktionszeit",
-        "verzögert", "ewiges laden", "warten", "verbindung langsam",
-        "nicht flüssig", "app ist träge", "verzögerte reagieren",
-        "ladeprobleme", "app ist langsam", "reagiert langsam",
-        "lange ladezeit", "performanceschwäche", "zu langsam",
-        "langsamer aufbau", "app lädt nicht sofort", "träge benutzung",
-        "startet langsam", "verarbeitung dauert", "menü öffnet langsam",
-        "daten laden ewig", "prozess dauert", "feedback dauert",
-        "anmeldung langsam", "reaktion zu spät", "verarbeitung verzögert"
-    ],
-    "Kundenservice": [
-        "support", "hotline", "rückruf", "keine antwort", "niemand erreichbar",
-        "service schlecht", "lange wartezeit", "kundendienst", "keine hilfe",
-        "service reagiert nicht", "keine unterstützung", "reagiert nicht",
-        "kontakt nicht möglich", "wartezeit", "keine rückmeldung",
-        "telefonisch nicht erreichbar", "keine lösung", "antwort dauert",
-        "kundenberatung fehlt", "keine antwort erhalten", "hotline nicht erreichbar",
-        "keine serviceleistung", "kundensupport schlecht", "kundenbetreuung mangelhaft",
-        "kundenservice reagiert nicht", "service schwer erreichbar", "service antwortet nicht",
-        "nicht geholfen", "unfreundlicher support", "hilft nicht weiter"
-    ],
-    "Kontaktmöglichkeiten": [
-        "ansprechpartner", "kontakt", "rückruf", "nicht erreichbar", "kein kontakt",
-        "keine kontaktdaten", "hilfe fehlt", "kontaktformular", "keine rückmeldung",
-        "support kontakt", "kein formular", "supportformular fehlt",
-        "kundendienst kontaktieren", "telefon fehlt", "email fehlt", "nur hotline",
-        "kontakt schwierig", "kontaktierung unklar", "kontaktoption fehlt",
-        "keine kontaktmöglichkeit", "nicht ansprechbar", "support schwer erreichbar",
-        "kein livechat", "keine supportmail", "anfrage nicht möglich",
-        "kein rückruf erhalten", "kontaktseite leer", "keine kontaktfunktion",
-        "kontaktmöglichkeit nicht ersichtlich", "anfrageformular fehlt"
-    ],
-    "Vertrauenswürdigkeit": [
-        "vertrauen", "abzocke", "nicht seriös", "zweifelhaft", "skepsis",
-        "nicht glaubwürdig", "unsicher", "nicht transparent", "betrugsverdacht",
-        "nicht vertrauenswürdig", "datensicherheit", "nicht nachvollziehbar",
-        "intransparente kosten", "unseriös", "abzocker", "misstrauen",
-        "unsicheres gefühl", "nicht überprüfbar", "unvollständig",
-        "zweifelhaftes angebot", "kein impressum", "keine transparenz",
-        "zweifelhaftes verhalten", "verdacht auf betrug", "unsichere kommunikation",
-        "fehlende datensicherheit", "keine aufklärung", "unzuverlässig",
-        "fragwürdig", "irreführend"
-    ],
-    "Gebühren": [
-        "gebühr", "zinsen", "bearbeitungsgebühr", "kosten", "preis", "zu teuer",
-        "gebühren nicht klar", "versteckte kosten", "nicht kostenlos",
-        "zusatzkosten", "gebühren unklar", "bankgebühren",
-        "gebührenerhöhung", "nicht transparent", "kosten zu hoch",
-        "gebührenänderung", "kontoführungsgebühr", "auszahlungsgebühr",
-        "transaktionsgebühr", "gebühr zu hoch", "zu hohe zinsen",
-        "gebühreninfo fehlt", "unverhältnismäßige gebühr", "gebühr nicht nachvollziehbar",
-        "entgelt", "gebührenbelastung", "gebühr nicht verständlich",
-        "servicegebühr", "provision", "kostenaufstellung fehlt"
-    ]
-}
+CACHE_PATH  = BASE_DIR / "data" / "result_cache.sqlite"
 
 # --- Nutzerverwaltung ---
 @st.cache_data(show_spinner=False)
@@ -228,97 +56,128 @@ def init_users() -> dict[str, str]:
 # WICHTIG: Globale User-Map initialisieren, bevor login() verwendet wird
 _USERS = init_users()
 
+# Admins sehen das Messwerte-Panel; muss ausdrücklich gesetzt werden (Default: niemand)
+ADMINS = set(st.secrets.get("ADMINS", []))
+
 def login(user: str, pwd: str) -> bool:
     """Vergleicht eingegebenes Passwort (SHA256) mit dem gespeicherten Hash."""
     target_hash = _USERS.get(user)
     return bool(target_hash) and (target_hash == hashlib.sha256(pwd.encode()).hexdigest())
 
 # --- GitHub Push ---
-def push_rules_to_github(rules: dict[str, list[str]]) -> tuple[bool, str]:
+@st.cache_resource(show_spinner=False)
+def get_github_sync() -> github_sync.GitHubSync:
     """
-    Commitet und pusht custom_rules.json per GitHub API.
+    Prozessweiter Sync-Worker: pusht custom_rules.json im Hintergrund,
+    bündelt schnelle Speichervorgänge und wiederholt bei Fehlern.
     VORAUSSETZUNG: PyGithub installiert + GITHUB_TOKEN, REPO_NAME gesetzt.
-    Gibt (True, message) bei Erfolg bzw. (False, error_message) zurück.
     """
-    if not Github or not GITHUB_TOKEN or not REPO_NAME:
-        return False, "GitHub-Commit übersprungen (fehlende Konfiguration)"
-    gh = Github(GITHUB_TOKEN)
-    try:
-        repo = gh.get_repo(REPO_NAME)
-    except Exception as e:
-        return False, f"Zugriff auf Repo fehlgeschlagen: {e}"
-    path = "data/custom_rules.json"
-    content = json.dumps(rules, indent=2, ensure_ascii=False)
-    try:
-        existing = repo.get_contents(path)
-        repo.update_file(path, "[Streamlit] Update rules", content, existing.sha)
-        return True, "custom_rules.json erfolgreich aktualisiert."
-    except GithubException as e:
-        if hasattr(e, 'status') and e.status == 404:
-            try:
-                repo.create_file(path, "[Streamlit] Create rules", content)
-                return True, "custom_rules.json angelegt und gepusht."
-            except Exception as e2:
-                return False, f"Fehler beim Erstellen der Datei: {e2}"
-        return False, f"Fehler beim Update: {e}"
-    except Exception as e:
-        return False, f"Unbekannter Fehler: {e}"
+    return github_sync.GitHubSync(GITHUB_TOKEN, REPO_NAME, base_url=GITHUB_BASE_URL,
+                      debounce=GITHUB_SYNC_DEBOUNCE, metrics=get_metrics())
+
+_SYNC_ICONS = {github_sync.PENDING: "⏳", github_sync.PUSHING: "🔄", github_sync.RETRYING: "🔁",
+               github_sync.SYNCED: "✅", github_sync.CONFLICT: "⚠️", github_sync.FAILED: "❌"}
+
+@st.fragment(run_every=2)
+def show_sync_status() -> None:
+    """Status des GitHub-Syncs; aktualisiert sich selbst, ohne die ganze Seite neu zu laden."""
+    sync = get_github_sync()
+    status = sync.status
+    if status.state in (github_sync.IDLE, github_sync.DISABLED):
+        return
+    when = datetime.datetime.fromtimestamp(status.updated).strftime("%H:%M:%S")
+    st.caption(f"{_SYNC_ICONS.get(status.state, '')} GitHub ({when}): {status.message}")
+    if status.state == github_sync.CONFLICT and st.button("GitHub-Stand überschreiben"):
+        sync.submit(load_rules(), force=True)
 
 # --- Regelverwaltung ---
 @st.cache_data(show_spinner=False)
 def load_rules() -> dict[str, list[str]]:
-    if not RULES_PATH.exists():
-        RULES_PATH.parent.mkdir(parents=True, exist_ok=True)
-        RULES_PATH.write_text(json.dumps(DEFAULT_RULES, indent=2, ensure_ascii=False), encoding="utf-8")
-    data = json.loads(RULES_PATH.read_text(encoding="utf-8"))
-    # Ergänze fehlende Defaults
-    for cat, terms in DEFAULT_RULES.items():
-        data.setdefault(cat, terms.copy())
-    return data
+    return categorizer.load_rules(RULES_PATH)
 
 def save_rules(rules: dict[str, list[str]]) -> None:
     # Speichere lokal
-    RULES_PATH.write_text(json.dumps(rules, indent=2, ensure_ascii=False), encoding="utf-8")
-    # Invalidate Caches
+    categorizer.write_rules(rules, RULES_PATH)
+    # Invalidate Caches (der Regel-Index patcht beim nächsten Rerun nur geänderte
+    # Kategorien, der Ergebnis-Cache bekommt über rules_hash eine neue Version)
     load_rules.clear()
-    build_patterns.clear()
-    # Push zu GitHub mit visuellem Feedback
-    with st.spinner("Pushe Regeln zu GitHub..."):
-        success, message = push_rules_to_github(rules)
-    if success:
-        st.success(message)
+    # Push zu GitHub im Hintergrund (Status in der Sidebar)
+    sync = get_github_sync()
+    sync.submit(rules)
+    if sync.enabled:
+        st.success("Regeln gespeichert, Push zu GitHub vorgemerkt.")
     else:
         # Nicht als Fehler markieren, wenn Konfig fehlt – sonst nervt es bei jedem Rerun.
-        if "übersprungen" in message:
-            st.info(message)
-        else:
-            st.error(message)
+        st.info("Regeln gespeichert. GitHub-Commit übersprungen (fehlende Konfiguration)")
 
 # --- Kategorisierung ---
 @st.cache_resource(show_spinner=False)
-def build_patterns(rules: dict[str, list[str]]) -> dict[str, re.Pattern]:
+def get_rules_index(normalize: bool) -> RulesIndex:
     """
-    Kompiliert Regex-Patterns. cache_resource verwendet In-Memory-Cache,
-    damit re.Pattern (nicht-serialisierbar) problemlos gecacht werden kann.
+    Prozessweiter Regel-Index. cache_resource verwendet In-Memory-Cache,
+    damit der (nicht-serialisierbare) Matcher problemlos gecacht werden kann.
     """
-    patterns: dict[str, re.Pattern] = {}
-    for cat, terms in rules.items():
-        if terms:
-            escaped = [re.escape(t) for t in terms]
-            try:
-                patterns[cat] = re.compile(r"\b(?:%s)\b" % "|".join(escaped), re.IGNORECASE)
-            except re.error:
-                # Fallback: wenn etwas schiefgeht, nimm einfache contains-Variante
-                patterns[cat] = re.compile("|".join(escaped), re.IGNORECASE)
-    return patterns
-
-def categorize_series(feedback: pd.Series, patterns: dict[str, re.Pattern]) -> pd.Series:
-    df = pd.DataFrame({'Feedback': feedback})
-    df['Kategorie'] = 'Sonstiges'
-    for cat, pat in patterns.items():
-        mask = df['Feedback'].str.contains(pat, regex=True, na=False)
-        df.loc[mask & (df['Kategorie'] == 'Sonstiges'), 'Kategorie'] = cat
-    return df['Kategorie']
+    return RulesIndex()
+
+def build_patterns(rules: dict[str, list[str]], normalize: bool) -> RuleMatcher:
+    """Matcher für die Regeln; bei Änderungen werden nur geänderte Kategorien neu eingetragen."""
+    return get_rules_index(normalize).get(rules)
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache() -> ResultCache:
+    """Persistenter Ergebnis-Cache, prozessweit geteilt."""
+    return ResultCache(CACHE_PATH)
+
+@st.cache_resource(show_spinner=False)
+def get_metrics() -> StageMetrics:
+    """Messwerte aller Sitzungen (prozessweit)."""
+    return StageMetrics()
+
+# --- Auswertung ---
+@st.cache_data(show_spinner=False, max_entries=16)
+def summarize_upload(key: tuple, _labels: pd.Series, _feedback: pd.Series):
+    """Anzahl, Anteile und Beispiele; ``key`` = (Upload, Regel-Version, Normalisierung)."""
+    return summarize(_labels, _feedback)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def category_chart(key: tuple, _shares: pd.Series) -> bytes:
+    """Balkendiagramm als PNG, einmal pro Upload und Regel-Version gerendert."""
+    return render_bar_chart(_shares)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def score_upload(key: tuple, _feedback: pd.Series, _matcher: RuleMatcher, normalize: bool) -> pd.DataFrame:
+    """Mehrfachkategorien pro Zeile; ``key`` = (Upload, Regel-Version, Normalisierung)."""
+    with get_metrics().stage("score", rows=len(_feedback)):
+        codes, uniques = dedupe_texts(_feedback.astype(str), normalize)
+        scores = _matcher.score(uniques)
+        return pd.DataFrame({
+            'Hauptkategorie': scores.primary_labels()[codes],
+            'Weitere Kategorien': scores.secondary_labels()[codes],
+            'Konfidenz': scores.confidence[codes],
+        }, index=_feedback.index)
+
+# --- Export ---
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_export(key: tuple, fmt: str, _df: pd.DataFrame) -> bytes:
+    """Exportdatei; ``key`` identifiziert die Daten, der DataFrame selbst wird nicht gehasht."""
+    with get_metrics().stage(f"export_{fmt}", rows=len(_df)):
+        return export.export(_df, fmt)
+
+def save_to_history(feedback: pd.Series, categories: pd.Series, uid: str, upload_date: datetime.date,
+                    rules_version: str, replace: bool = False) -> None:
+    try:
+        if append_upload(feedback, categories, uid, upload_date, rules_version, replace=replace):
+            st.toast("Upload im Verlauf gespeichert.")
+    except (OSError, ValueError) as e:
+        st.warning(f"Verlauf konnte nicht gespeichert werden: {e}")
+
+# --- Profiling ---
+def finish_profile(profiler: RunProfiler) -> None:
+    """Bericht nur übernehmen, wenn der Rerun eingelesen und kategorisiert hat; sonst bleibt der Profiler scharf."""
+    report = profiler.stop()
+    if st.session_state.pop("profile_work", False):
+        st.session_state.profile_report = report
+        st.session_state.profile_armed = False
 
 # --- UI: Login ---
 def show_login() -> None:
@@ -328,6 +187,7 @@ def show_login() -> None:
     if st.button("🚀 Anmelden"):
         if login(user, pwd):
             st.session_state.authenticated = True
+            st.session_state.user = user
             st.success("✅ Erfolgreich angemeldet")
             st.rerun()
         else:
@@ -340,50 +200,170 @@ if not st.session_state.authenticated:
     show_login()
     st.stop()
 
+# --- Instrumentierung ---
+metrics = get_metrics()
+run_id  = uuid.uuid4().hex[:8]
+# Profiler eines Reruns, der per st.stop() vorzeitig endete, hier abschließen
+stale = st.session_state.pop("profiler", None)
+if stale is not None and stale.running:
+    finish_profile(stale)
+# Scharf geschalteter Profiler läuft in jedem Rerun mit, bis einer tatsächlich einliest
+if st.session_state.get("profile_armed"):
+    st.session_state.profile_work = False
+    st.session_state.profiler = RunProfiler().start()
+
 rules    = load_rules()
-patterns = build_patterns(rules)
-mode     = st.sidebar.radio("Modus", ["Analyse", "Regeln verwalten", "Regeln lernen"])
+with st.sidebar:
+    show_sync_status()
+mode     = st.sidebar.radio("Modus", ["Analyse", "Regeln verwalten", "Regeln lernen", "Verlauf"])
+normalize = st.sidebar.checkbox("Texte normalisieren", value=True,
+                                help="Groß-/Kleinschreibung, Leerraum, Satzzeichen und 'ue'/'ü' vor dem Matching vereinheitlichen")
+# Regeln in der Form, in der sie gematcht werden (bei Normalisierung mit normalisierten Begriffen)
+match_rules = normalize_rules(rules) if normalize else rules
+with metrics.stage("build_patterns", run_id, rows=sum(map(len, match_rules.values()))):
+    patterns = build_patterns(match_rules, normalize)
+rules_version = rules_hash(match_rules)
+parallel_categorizer = shared_categorizer(match_rules, WORKERS, matcher=patterns, version=rules_version)
+result_cache  = get_result_cache()
 
 # --- Analyse ---
 if mode == "Analyse":
     st.title("📊 Feedback-Kategorisierung")
-    uploaded = st.file_uploader("Excel (Spalte 'Feedback')", type=["xlsx"])
+    uploaded = st.file_uploader("Excel, CSV oder Parquet (Spalte 'Feedback')", type=SUPPORTED_TYPES)
+    history_date = st.date_input("Datum für den Verlauf", value=datetime.date.today(),
+                                 help="Zeitpunkt, unter dem der Upload im Verlauf einsortiert wird (z. B. Monat der Umfrage)")
     if uploaded:
-        try:
-            df = pd.read_excel(uploaded)  # setzt openpyxl voraus
-        except Exception as e:
-            st.error(f"Fehler beim Einlesen der Excel-Datei: {e}")
-            st.stop()
-
-        if 'Feedback' in df.columns:
-            df['Kategorie'] = categorize_series(df['Feedback'].astype(str), patterns)
-            st.dataframe(df[['Feedback', 'Kategorie']], use_container_width=True)
-
-            counts = df['Kategorie'].value_counts(normalize=True).mul(100).sort_values()
-            fig, ax = plt.subplots()
-            counts.plot.barh(ax=ax)
-            ax.set_xlabel("Anteil (%)")
-            ax.set_ylabel("Kategorie")
-            ax.set_title("Verteilung der Kategorien")
-            st.pyplot(fig, clear_figure=True)
-
-            st.download_button("Download CSV", df.to_csv(index=False), "feedback.csv")
-            buf = io.BytesIO()
+        uid = upload_id(uploaded.getvalue())
+        # Ergebnis pro (Upload, Regel-Version) merken: Reruns durch Widgets kategorisieren nicht neu
+        analysis_key = (uid, rules_version, normalize)
+        cached = st.session_state.get("analysis")
+        if cached is not None and cached[0] == analysis_key:
+            _, df, hit_rate = cached
+        else:
+            # Chunkweise einlesen und sofort kategorisieren, Zwischenstand live anzeigen
+            st.session_state.profile_work = True
+            # "Neu analysieren und profilieren": Matching messen, nicht den Ergebnis-Cache
+            cache = None if st.session_state.pop("profile_skip_cache", False) else result_cache
+            categories = category_order(rules)
+            total = estimate_rows(uploaded, uploaded.name)
+            progress = st.progress(0.0, text="Lese Datei...")
+            live = st.empty()
+            chunks: list[pd.DataFrame] = []
+            running = np.zeros(len(categories), dtype=np.int64)
+            done = 0
+            has_feedback = True
+            hits_before, misses_before = result_cache.hits, result_cache.misses
             try:
-                with pd.ExcelWriter(buf, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name="Kategorien")
-                buf.seek(0)
-                st.download_button("Download Excel", buf, "feedback.xlsx")
+                for chunk in metrics.timed_iter("read", iter_chunks(uploaded, uploaded.name), run_id):
+                    if 'Feedback' not in chunk.columns:
+                        has_feedback = False
+                        break
+                    with metrics.stage("categorize_series", run_id, rows=len(chunk)):
+                        chunk['Kategorie'] = as_categorical(categorize_series(chunk['Feedback'].astype(str), parallel_categorizer, cache, rules_version, normalize), categories)
+                    chunks.append(chunk)
+                    done += len(chunk)
+                    running += np.bincount(chunk['Kategorie'].cat.codes, minlength=len(categories))
+                    share = done / total if total else uploaded.tell() / max(uploaded.size, 1)
+                    progress.progress(min(share, 1.0), text=f"{done:,} Zeilen kategorisiert")
+                    live_counts = pd.Series(running, index=categories, name="Anzahl")
+                    live.dataframe(live_counts[live_counts > 0].sort_values(ascending=False))
             except Exception as e:
-                st.warning(f"Excel-Export nicht möglich: {e}")
+                st.error(f"Fehler beim Einlesen der Datei: {e}")
+                st.stop()
+            progress.empty()
+            live.empty()
+            if not has_feedback:
+                st.error("Spalte 'Feedback' nicht gefunden.")
+                st.stop()
+            hits = result_cache.hits - hits_before
+            lookups = hits + result_cache.misses - misses_before
+            hit_rate = f"{hits / lookups:.0%}" if lookups else "–"
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(
+                {'Feedback': pd.Series(dtype=object), 'Kategorie': as_categorical([], categories)})
+            st.session_state.analysis = (analysis_key, df, hit_rate)
+            # Für "Regeln lernen" und die Abdeckungsanalyse merken
+            st.session_state.last_analysis = df[['Feedback', 'Kategorie']]
+            st.session_state.last_analysis_uid = uid
+        st.sidebar.metric("Cache-Trefferquote", hit_rate,
+                          help="Anteil der eindeutigen Texte, die ohne erneutes Matching aus dem Cache kamen")
+        # Spalten für die Mehrfachkategorien nicht im gemerkten Ergebnis anlegen
+        df = df.copy(deep=False)
+
+        # Im Verlauf erst auf Knopfdruck ablegen, damit das dann gewählte Datum gilt
+        stored = stored_date(uid)
+        if stored is None:
+            st.button("💾 Im Verlauf speichern", on_click=save_to_history,
+                      args=(df['Feedback'], df['Kategorie'], uid, history_date, rules_version))
         else:
-            st.error("Spalte 'Feedback' nicht gefunden.")
+            st.caption(f"Im Verlauf gespeichert unter dem {stored:%d.%m.%Y}.")
+            if stored != history_date:
+                st.button(f"📅 Datum im Verlauf auf {history_date:%d.%m.%Y} ändern", on_click=save_to_history,
+                          args=(df['Feedback'], df['Kategorie'], uid, history_date, rules_version, True))
+
+        summary = summarize_upload(analysis_key, df['Kategorie'], df['Feedback'])
+        with metrics.stage("matplotlib", run_id, rows=len(summary.shares)):
+            st.image(category_chart(analysis_key, summary.shares))
+        selected = st.pills("Drill-down nach Kategorie", list(summary.counts.index), selection_mode="multi",
+                            format_func=lambda c: f"{c} ({summary.counts[c]:,})")
+        with st.expander("Anzahl, Anteil und Beispiele je Kategorie"):
+            st.dataframe(summary.table(), use_container_width=True)
+
+        shown = ['Feedback', 'Kategorie']
+        if st.checkbox("Mehrfachkategorien anzeigen", help="Alle Treffer pro Zeile zählen und nach Trefferzahl gewichten"):
+            # Einmal pro Upload und Regel-Version; Pills- und andere Widget-Reruns nutzen das Ergebnis
+            multi = score_upload(analysis_key, df['Feedback'], patterns, normalize)
+            df[list(multi.columns)] = multi
+            shown += list(multi.columns)
+        st.dataframe(df.loc[df['Kategorie'].isin(selected), shown] if selected else df[shown], use_container_width=True)
+
+        # Export erst beim Klick erzeugen; gecacht pro (Upload, Regel-Version, Spalten)
+        export_key = (*analysis_key, tuple(df.columns))
+        c1, c2 = st.columns([3, 1], vertical_alignment="bottom")
+        fmt = c1.radio("Exportformat", list(export.FORMATS), horizontal=True)
+        ext, mime = export.FORMATS[fmt]
+        too_big = fmt == "Excel" and len(df) >= export.EXCEL_MAX_ROWS
+        c2.download_button(f"Download {fmt}", lambda: build_export(export_key, fmt, df), f"feedback.{ext}",
+                           mime=mime, disabled=too_big,
+                           help="Zu viele Zeilen für Excel – bitte CSV oder Parquet wählen" if too_big else None)
 
 # --- Regeln verwalten ---
 elif mode == "Regeln verwalten":
     st.title("🔧 Regeln verwalten")
     changed = False
 
+    # Abdeckung der Regeln auf dem letzten Upload (ein Matcher-Durchlauf, danach nur Index-Auswertung)
+    analysis = st.session_state.get("last_analysis")
+    if analysis is not None and not analysis.empty:
+        cov_key = (st.session_state.get("last_analysis_uid"), rules_version, normalize)
+        cached = st.session_state.get("coverage")
+        if cached is None or cached[0] != cov_key:
+            with st.spinner("Baue Begriffs-Index..."):
+                codes, uniques = dedupe_texts(analysis['Feedback'].astype(str), normalize)
+                index = TermIndex.build(patterns.score(uniques), np.bincount(codes, minlength=len(uniques)))
+                cached = st.session_state.coverage = (cov_key, index, uniques, analyze(patterns, index))
+        _, index, uniques, report = cached
+        with st.expander(f"📈 Abdeckung im letzten Upload ({len(analysis):,} Zeilen)", expanded=False):
+            status = report.terms['Status'].value_counts()
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Tote Begriffe", int(status.get("tot", 0)))
+            m2.metric("Verdeckte Begriffe", int(status.get("verdeckt", 0)))
+            m3.metric("Teilweise verdeckt", int(status.get("teilweise verdeckt", 0)))
+            show = st.multiselect("Status", ["tot", "verdeckt", "teilweise verdeckt", "aktiv"],
+                                  default=["tot", "verdeckt", "teilweise verdeckt"])
+            st.dataframe(report.terms[report.terms['Status'].isin(show)]
+                         .sort_values(['Status', 'Treffer'], ascending=[True, False]),
+                         hide_index=True, use_container_width=True)
+            st.markdown("**Zuordnung pro Kategorie**")
+            st.dataframe(report.categories, use_container_width=True)
+            st.markdown("**Überschneidungen** (Zeilen, die beide Kategorien treffen)")
+            st.dataframe(report.overlap, use_container_width=True)
+            st.markdown("**Verdeckung** (Zeile gewinnt Texte, die auch die Spalte getroffen hätte)")
+            st.dataframe(report.shadowing, use_container_width=True)
+            term = st.selectbox("Beispiele für Begriff", sorted(set(report.terms['Begriff'])), index=None)
+            if term is not None:
+                rows = index.rows_for(patterns.terms.index(term))
+                st.write(pd.Series(uniques, dtype=object).iloc[rows[:20]].tolist() or "Keine Treffer.")
+
     for cat in sorted(rules.keys()):
         with st.expander(f"{cat} ({len(rules[cat])} Begriffe)", expanded=False):
             updated: list[str] = []
@@ -431,3 +411,121 @@ elif mode == "Regeln verwalten":
         st.info("Es gibt ungespeicherte Änderungen.")
 
 # --- Regeln lernen ---
+elif mode == "Regeln lernen":
+    st.title("🧠 Regeln lernen")
+    analysis = st.session_state.get("last_analysis")
+    if analysis is None or analysis.empty:
+        st.info("Bitte zuerst im Modus 'Analyse' eine Datei kategorisieren.")
+        st.stop()
+
+    other = int((analysis['Kategorie'] == "Sonstiges").sum())
+    st.caption(f"{len(analysis):,} Zeilen aus der letzten Analyse, davon {other:,} 'Sonstiges'.")
+    c1, c2, c3 = st.columns(3)
+    min_support   = c1.number_input("Min. 'Sonstiges'-Zeilen", min_value=1, value=5)
+    max_n         = c2.slider("Max. Wörter je Begriff", 1, 4, 3)
+    min_precision = c3.slider("Min. Präzision", 0.0, 1.0, 0.5, 0.05)
+
+    if st.button("🔍 Vorschläge berechnen"):
+        with st.spinner("Suche Begriffe..."):
+            st.session_state.proposals = mine_candidates(
+                analysis['Feedback'], analysis['Kategorie'], rules,
+                max_n=max_n, min_support=int(min_support), min_precision=min_precision,
+            )
+
+    proposals = st.session_state.get("proposals")
+    if proposals is not None:
+        if proposals.empty:
+            st.warning("Keine Vorschläge gefunden – ggf. Schwellwerte senken.")
+        else:
+            edited = st.data_editor(
+                proposals.assign(Übernehmen=False),
+                column_config={
+                    "Übernehmen": st.column_config.CheckboxColumn(),
+                    "Kategorie": st.column_config.SelectboxColumn(options=sorted(rules.keys())),
+                },
+                disabled=["Abdeckung", "Präzision", "Erwarteter Gewinn", "Belege"],
+                hide_index=True, use_container_width=True, key="proposal_editor",
+            )
+            accepted = edited[edited["Übernehmen"]]
+            if st.button(f"✅ {len(accepted)} Vorschläge übernehmen", disabled=accepted.empty, type="primary"):
+                for cat, term in zip(accepted["Kategorie"], accepted["Begriff"]):
+                    if term not in rules.setdefault(cat, []):
+                        rules[cat].append(term)
+                save_rules(rules)
+                log_accepted(accepted, LOG_PATH)
+                st.session_state.proposals = proposals[~proposals["Begriff"].isin(accepted["Begriff"])].reset_index(drop=True)
+                st.success(f"{len(accepted)} Begriffe übernommen und protokolliert.")
+
+# --- Verlauf ---
+elif mode == "Verlauf":
+    st.title("📈 Verlauf")
+    try:
+        uploads = upload_summaries()
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+    if uploads.empty:
+        st.info("Noch keine Uploads im Verlauf – Dateien im Modus 'Analyse' kategorisieren.")
+        st.stop()
+
+    c1, c2 = st.columns(2)
+    freq = FREQUENCIES[c1.selectbox("Zeitraster", list(FREQUENCIES))]
+    first, last = uploads['Datum'].min().date(), uploads['Datum'].max().date()
+    period = c2.date_input("Zeitraum", value=(first, last), min_value=first, max_value=last)
+    start, end = (period[0], period[-1]) if period else (first, last)
+
+    counts, shares = category_trend(freq, start=start, end=end)
+    if counts.empty:
+        st.info("Keine Uploads im gewählten Zeitraum.")
+        st.stop()
+    selected = uploads[(uploads['Datum'] >= pd.Timestamp(start)) & (uploads['Datum'] <= pd.Timestamp(end))]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Uploads", selected['Upload'].nunique())
+    m2.metric("Zeilen", f"{int(selected['Anzahl'].sum()):,}")
+    if m3.button("Eindeutige Texte zählen", help="Liest die Text-Hashes des Zeitraums (memory-mapped)"):
+        m3.metric("Eindeutige Texte", f"{load_history(['text_hash'], start, end)['text_hash'].nunique():,}")
+
+    cats = st.multiselect("Kategorien", list(shares.columns), default=list(shares.columns))
+    st.line_chart(shares[cats], y_label="Anteil (%)")
+    st.dataframe(shares[cats].round(1), use_container_width=True)
+    with st.expander("Absolute Zahlen und Uploads"):
+        st.dataframe(counts[cats], use_container_width=True)
+        st.dataframe(selected.groupby(['Datum', 'Upload', 'Regel-Version'], as_index=False)['Anzahl'].sum(),
+                     hide_index=True, use_container_width=True)
+
+# --- Messwerte (nur Admins) ---
+profiler = st.session_state.pop("profiler", None)
+if profiler is not None and profiler.running:
+    finish_profile(profiler)
+
+if st.session_state.get("user") in ADMINS:
+    with st.sidebar.expander("⏱️ Messwerte"):
+        records = metrics.last_run(run_id)
+        if records:
+            st.dataframe(pd.DataFrame({
+                "Schritt": [r.stage for r in records],
+                "Sekunden": [round(r.seconds, 3) for r in records],
+                "Zeilen": [r.rows for r in records],
+                "Zeilen/s": [round(r.rows / r.seconds) if r.rows and r.seconds else None for r in records],
+                "Speicher Δ (MB)": [round(r.memory_delta / 2**20, 1) if r.memory_delta is not None else None for r in records],
+            }), hide_index=True)
+        else:
+            st.caption("In diesem Rerun wurde nichts gemessen.")
+        d1, d2 = st.columns(2)
+        d1.download_button("Prometheus", metrics.to_prometheus, "metrics.prom", mime="text/plain")
+        d2.download_button("JSON Lines", metrics.to_jsonl, "metrics.jsonl", mime="application/x-ndjson")
+        armed = st.session_state.get("profile_armed", False)
+        if armed:
+            st.caption("🔬 Profiler aktiv – wartet auf den nächsten Rerun, der eine Datei einliest und kategorisiert.")
+        if st.button("🔬 Nächste Analyse profilieren", disabled=armed):
+            st.session_state.profile_armed = True
+            st.rerun()
+        if st.button("🔁 Neu analysieren und profilieren", help="Verwirft das gemerkte Ergebnis und umgeht den Ergebnis-Cache"):
+            st.session_state.profile_armed = True
+            st.session_state.profile_skip_cache = True
+            st.session_state.pop("analysis", None)
+            st.rerun()
+        report = st.session_state.get("profile_report")
+        if report:
+            st.download_button("Profil herunterladen", report, "profile.txt", mime="text/plain")
+            st.code(report[:5000], language=None)
@@ -0,0 +1,50 @@
+"""
+Vergleicht den bisherigen Regex-Pfad (ein str.contains pro Kategorie) mit dem
+Single-Pass-Matcher und prüft, dass beide identische Kategorien liefern.
+
+Aufruf:  python benchmarks/bench_matcher.py --rows 200000
+"""
+import argparse
+import json
+import sys
+import time
+
+import pandas as pd
+
+from corpus import BASE_DIR, generate_feedback
+from matcher import RuleMatcher, categorize_regex, compile_regex_patterns
+
+RULES_PATH = BASE_DIR / "data" / "custom_rules.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rules = json.loads(RULES_PATH.read_text(encoding="utf-8"))
+    feedback = generate_feedback(args.rows, dup_ratio=0.3, seed=args.seed, rules=rules)
+
+    t0 = time.perf_counter()
+    patterns = compile_regex_patterns(rules)
+    t1 = time.perf_counter()
+    expected = categorize_regex(feedback, patterns)
+    t2 = time.perf_counter()
+    matcher = RuleMatcher(rules)
+    t3 = time.perf_counter()
+    labels = matcher.categorize(feedback)
+    t4 = time.perf_counter()
+
+    mismatches = int((expected.to_numpy() != pd.Series(labels).to_numpy()).sum())
+    print(f"Zeilen:        {args.rows:,}")
+    print(f"Regex:         compile {t1 - t0:.3f}s, match {t2 - t1:.2f}s ({args.rows / (t2 - t1):,.0f} Zeilen/s)")
+    print(f"RuleMatcher:   compile {t3 - t2:.3f}s, match {t4 - t3:.2f}s ({args.rows / (t4 - t3):,.0f} Zeilen/s)")
+    print(f"Speedup:       {(t2 - t1) / (t4 - t3):.1f}x")
+    print(f"Abweichungen:  {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
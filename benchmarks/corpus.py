@@ -0,0 +1,72 @@
+"""
+Synthetischer, reproduzierbarer Feedback-Korpus für Benchmarks.
+
+Mischt Begriffe aus den Regeln (Default: ``DEFAULT_RULES``) mit deutschen
+Füllsätzen. ``dup_ratio`` steuert den Anteil an Zeilen, die Wiederholungen
+früherer Texte sind – teils exakt, teils nur in Schreibweise, Leerraum oder
+Satzzeichen abweichend, wie in echten Exporten.
+"""
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from categorizer import DEFAULT_RULES  # noqa: E402
+
+TEMPLATES = [
+    "{filler} {term}",
+    "Seit dem letzten Update {term}, {filler}",
+    "{term}! {filler}",
+    "Leider {term} – bitte schnell beheben",
+    "Die App ist okay, aber {term}. {filler}",
+    "{filler}. Außerdem: {term}",
+    "Warum {term}??",
+    "{filler}",
+]
+
+FILLER = [
+    "ich nutze die app täglich", "insgesamt zufrieden", "das ist ärgerlich", "bitte verbessern",
+    "danke für die schnelle hilfe", "so kann das nicht bleiben", "meine bank war früher besser",
+    "ich überlege zu wechseln", "seit wochen das gleiche", "5 sterne wenn das klappt",
+    "heute morgen wieder", "auf dem iphone und android", "nach dem neustart genauso",
+    "eigentlich eine gute app", "kein kommentar", "mal sehen", "echt schade",
+]
+
+
+def _variant(text: str, rnd: random.Random) -> str:
+    """Nahezu-Duplikat: andere Schreibweise, Leerraum oder Satzzeichen."""
+    r = rnd.random()
+    if r < 0.25:
+        return text.upper()
+    if r < 0.5:
+        return "  " + text.replace(" ", "  ") + " "
+    if r < 0.75:
+        return text.rstrip(".!?") + "!!!"
+    return text.replace("ü", "ue").replace("ö", "oe").replace("ä", "ae")
+
+
+def generate_feedback(rows: int, dup_ratio: float = 0.0, seed: int = 42,
+                      rules: dict[str, list[str]] | None = None, match_ratio: float = 0.8) -> pd.Series:
+    """
+    Liefert ``rows`` Feedback-Texte. ``match_ratio`` ist der Anteil
+    eindeutiger Texte, die mindestens einen Regel-Begriff enthalten.
+    """
+    rnd = random.Random(seed)
+    terms = [t for ts in (rules or DEFAULT_RULES).values() for t in ts]
+    n_unique = max(1, round(rows * (1 - dup_ratio))) if rows else 0
+    texts: list[str] = []
+    for _ in range(n_unique):
+        template = rnd.choice(TEMPLATES)
+        term = rnd.choice(terms) if rnd.random() < match_ratio else rnd.choice(FILLER)
+        text = template.format(term=term, filler=rnd.choice(FILLER))
+        texts.append(text[0].upper() + text[1:])
+    for _ in range(rows - n_unique):
+        text = texts[rnd.randrange(n_unique)]
+        texts.append(text if rnd.random() < 0.5 else _variant(text, rnd))
+    rnd.shuffle(texts)
+    return pd.Series(texts, name="Feedback")
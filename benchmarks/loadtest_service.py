@@ -0,0 +1,87 @@
+"""
+Lasttest für den Kategorisierungsdienst (service.py).
+
+Öffnet ``--concurrency`` Keep-Alive-Verbindungen und schickt insgesamt
+``--requests`` Anfragen mit je ``--batch`` Texten. Ausgegeben werden p50/p99
+der Latenz sowie Anfragen und Texte pro Sekunde.
+
+Aufruf (Dienst muss laufen):  python benchmarks/loadtest_service.py --port 8080
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from corpus import BASE_DIR, generate_feedback
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, body: bytes) -> dict:
+    writer.write(
+        f"POST /categorize HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length)
+    if b" 200 " not in status:
+        raise RuntimeError(f"{status.decode().strip()}: {data.decode()}")
+    return json.loads(data)
+
+
+async def _worker(host: str, port: int, bodies: list[bytes], latencies: list[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            t0 = time.perf_counter()
+            await _request(reader, writer, host, body)
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    rules = json.loads((BASE_DIR / "data" / "custom_rules.json").read_text(encoding="utf-8"))
+    texts = generate_feedback(args.requests * args.batch, dup_ratio=0.5, seed=args.seed, rules=rules).tolist()
+    if args.batch == 1:
+        bodies = [json.dumps({"text": t}, ensure_ascii=False).encode("utf-8") for t in texts]
+    else:
+        bodies = [json.dumps({"texts": texts[i:i + args.batch]}, ensure_ascii=False).encode("utf-8")
+                  for i in range(0, len(texts), args.batch)]
+    shards = [bodies[i::args.concurrency] for i in range(args.concurrency)]
+    latencies: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(args.host, args.port, shard, latencies) for shard in shards if shard))
+    elapsed = time.perf_counter() - start
+
+    print(f"Anfragen:    {len(latencies):,} à {args.batch} Text(e), {args.concurrency} Verbindungen")
+    print(f"Latenz p50:  {_percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"Latenz p99:  {_percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"Durchsatz:   {len(latencies) / elapsed:,.0f} Anfragen/s, {len(texts) / elapsed:,.0f} Texte/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=1, help="Texte pro Anfrage")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark-Suite für ``build_patterns`` und ``categorize_series``.
+
+Misst je Fall (Zeilenzahl x Duplikatanteil x Normalisierung) die
+Compile-Zeit der Patterns, den Durchsatz in Zeilen/s und den Peak-RSS. Jeder
+Fall läuft in einem eigenen Prozess, damit der Peak-RSS nicht von früheren
+Fällen verfälscht wird.
+
+    python benchmarks/run_benchmarks.py --save-baseline     # Baseline anlegen
+    python benchmarks/run_benchmarks.py                     # gegen Baseline prüfen
+
+Mit Baseline endet der Lauf mit Exit-Code 1, wenn ein Fall um mehr als
+``--threshold`` (Default 20 %) weniger Durchsatz hat oder mehr Speicher
+braucht. Die Compile-Zeit (wenige Millisekunden, stark verrauscht) wird nur
+berichtet, nicht geprüft.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from corpus import generate_feedback
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_DUP_RATIOS = [0.0, 0.8]
+
+# Geprüfte Metriken -> True, wenn größere Werte besser sind
+METRICS = {"rows_per_s": True, "peak_rss_mb": False}
+# Nur berichtet: Änderungen im Millisekundenbereich sind Messrauschen
+REPORTED = ["compile_s"]
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: Bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(rows: int, dup_ratio: float, normalize: bool, seed: int, repeat: int) -> dict:
+    from categorizer import DEFAULT_RULES, build_patterns, categorize_series
+    from normalize import normalize_rules
+
+    feedback = generate_feedback(rows, dup_ratio=dup_ratio, seed=seed)
+    rules = normalize_rules(DEFAULT_RULES) if normalize else DEFAULT_RULES
+    compile_s = min(_timed(build_patterns, rules)[0] for _ in range(repeat))
+    patterns = build_patterns(rules)
+    best, labels = min(_timed(categorize_series, feedback, patterns, normalize=normalize) for _ in range(repeat))
+    return {
+        "rows": rows,
+        "dup_ratio": dup_ratio,
+        "normalize": normalize,
+        "compile_s": round(compile_s, 5),
+        "categorize_s": round(best, 4),
+        "rows_per_s": round(rows / best, 1),
+        "peak_rss_mb": _peak_rss_mb(),
+        "sonstiges_share": round(float((labels == "Sonstiges").mean()), 4),
+    }
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+def case_key(case: dict) -> str:
+    return f"rows={case['rows']} dup={case['dup_ratio']} norm={case['normalize']}"
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Liste der Verschlechterungen gegenüber der Baseline (leer = alles ok)."""
+    base_cases = {case_key(c): c for c in baseline.get("cases", [])}
+    problems = []
+    for case in results:
+        base = base_cases.get(case_key(case))
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > threshold:
+                problems.append(f"{case_key(case)}: {metric} {old} -> {new} ({change:+.0%} schlechter)")
+    return problems
+
+
+def report_ungated(results: list[dict], baseline: dict) -> list[str]:
+    """Änderungen der nicht geprüften Metriken (nur zur Information)."""
+    base_cases = {case_key(c): c for c in baseline.get("cases", [])}
+    lines = []
+    for case in results:
+        base = base_cases.get(case_key(case))
+        if base is None:
+            continue
+        for metric in REPORTED:
+            old, new = base.get(metric), case.get(metric)
+            if old and new is not None:
+                lines.append(f"{case_key(case)}: {metric} {old} -> {new} ({(new - old) / old:+.0%})")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Zeilenzahlen (z. B. 10000 100000 1000000)")
+    parser.add_argument("--dup-ratios", type=float, nargs="+", default=DEFAULT_DUP_RATIOS)
+    parser.add_argument("--no-normalize", action="store_true", help="Nur den Pfad ohne Normalisierung messen")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen je Fall (bester Wert zählt)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Ergebnis als neue Baseline speichern")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Erlaubte Verschlechterung (0.2 = 20 %%)")
+    parser.add_argument("--output", type=Path, help="Ergebnis zusätzlich als JSON schreiben")
+    args = parser.parse_args()
+
+    cases = [(rows, dup, norm) for rows in args.sizes for dup in args.dup_ratios
+             for norm in ([False] if args.no_normalize else [True, False])]
+    results = []
+    ctx = mp.get_context("spawn")
+    for rows, dup, norm in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            case = pool.submit(_run_case, rows, dup, norm, args.seed, args.repeat).result()
+        results.append(case)
+        rss = f"{case['peak_rss_mb']:.0f} MB" if case["peak_rss_mb"] is not None else "n/a"
+        print(f"{case_key(case):<32} compile {case['compile_s'] * 1000:7.1f} ms  "
+              f"{case['rows_per_s']:>12,.0f} Zeilen/s  Peak-RSS {rss}", flush=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"Keine Baseline unter {args.baseline} – mit --save-baseline anlegen.")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    for line in report_ungated(results, baseline):
+        print(f"info: {line}")
+    problems = compare(results, baseline, args.threshold)
+    for problem in problems:
+        print(f"LANGSAMER: {problem}")
+    if not problems:
+        print(f"Keine Verschlechterung > {args.threshold:.0%} gegenüber {args.baseline.name}.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
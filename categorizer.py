@@ -0,0 +1,360 @@
+"""
+Regel-Engine der Feedback-Kategorisierung ohne Streamlit-Abhängigkeit.
+
+Enthält Default-Regeln, Laden der Regeln, Aufbau des Matchers und
+``categorize_series``; ``app.py`` legt nur noch Streamlit-Caches darüber.
+Als Batch-Einstiegspunkt für Cronjobs/Airflow:
+
+    python -m categorizer feedback.xlsx -o feedback_kategorisiert.csv
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import IO, Iterator
+
+import numpy as np
+import pandas as pd
+
+from ingest import DEFAULT_CHUNK_SIZE, file_type, iter_chunks
+from matcher import RuleMatcher
+from normalize import dedupe_texts, normalize_rules
+from parallel import ParallelCategorizer
+from result_cache import ResultCache, rules_hash
+
+# --- Pfade ---
+BASE_DIR    = Path(__file__).parent
+RULES_PATH  = BASE_DIR / "data" / "custom_rules.json"
+
+
+# --- Default-Regeln ---
+DEFAULT_RULES: dict[str, list[str]] = {
+    "Login": [
+        "einloggen", "login", "passwort", "anmeldung", "einloggen fehlgeschlagen", "nicht einloggen", "login funktioniert nicht",
+        "authentifizierung fehler", "probleme beim anmelden", "nicht angemeldet", "zugriff", "fehlermeldung", "konto", "abmeldung",
+        "kennwort", "verbindungsfehler", "sitzung", "anmeldedaten", "nutzerdaten", "loginversuch", "keine anmeldung möglich",
+        "probleme mit login", "passwort falsch", "kennwort zurücksetzen", "neues passwort", "loginseite", "loginfenster",
+        "verbindung fehlgeschlagen", "nicht authentifiziert", "anmeldung abgelehnt", "nutzerdaten ungültig", "app meldet fehler",
+        "einloggen unmöglich", "nicht mehr angemeldet", "verbindung wird getrennt", "sitzung beendet", "session läuft ab",
+        "fehlversuch login", "loginblockade"
+    ],
+    "TAN Probleme": [
+        "tan", "code", "authentifizierung", "bestätigungscode", "code kommt nicht", "tan nicht erhalten", "sms tan",
+        "tan eingabe", "problem mit tan", "keine tan bekommen", "tan ungültig", "tan feld fehlt", "neue tan", "tan abgelaufen",
+        "tan funktioniert nicht", "tan wird nicht akzeptiert", "falscher tan code", "keine tan sms", "tan verzögert", "push tan",
+        "photo tan", "mTAN", "secure tan", "tan app", "tan mail", "email tan", "keine tan gesendet", "2-faktor tan",
+        "tan bleibt leer", "probleme mit authentifizierung"
+    ],
+    "App abstürze": [
+        "absturz", "hängt", "app stürzt ab", "reagiert nicht", "crash", "app friert ein", "schließt sich", "hängt sich auf",
+        "abgestürzt", "beendet sich", "app hängt sich auf", "app schließt unerwartet", "fehler beim starten", "app startet nicht",
+        "startet nicht mehr", "app funktioniert nicht", "nichts passiert", "plötzlich beendet", "bleibt stehen", "app reagiert nicht",
+        "schwarzer bildschirm", "app lädt nicht", "absturz beim öffnen", "abbruch", "fehler beim öffnen", "startproblem",
+        "app bleibt hängen", "app hängt fest", "schließt nach start", "app stürzt ständig ab"
+    ],
+    "Fehler / Bugs": [
+        "fehler", "bug", "problem", "funktioniert nicht", "technischer fehler", "defekt", "störung", "anwendungsfehler",
+        "fehlerhaft", "problematisch", "systemfehler", "fehlermeldung", "appfehler", "softwareproblem", "ausnahmefehler",
+        "programmfehler", "fehleranzeige", "abbruchfehler", "nicht verfügbar", "error", "fehlfunktion", "nicht geladen",
+        "seitenfehler", "prozessfehler", "absturzmeldung", "stopp", "hänger", "service nicht erreichbar", "ladefehler",
+        "modulproblem"
+    ],
+    "Rückzahlungsoptionen": [
+        "rückzahlung", "raten", "tilgung", "zurückzahlen", "zahlung aufteilen", "zahlungspause", "rate ändern",
+        "tilgungsplan", "rückzahlung ändern", "ratenzahlung", "rückzahlungsplan", "abzahlungsoption", "zahlung stunden",
+        "zahlungsaufschub", "zahlung reduzieren", "monatsrate ändern", "zahlung anpassen", "flexible raten",
+        "anpassung rate", "kreditrückzahlung", "anzahlung", "zahlung verschieben", "abzahlungsdauer", "rückzahlungsart",
+        "zahlung in teilen", "verzögerung", "teilrückzahlung", "ablösung kredit", "rate pausieren", "rate aussetzen"
+    ],
+    "Zahlungsprobleme": [
+        "zahlung", "überweisung", "geld senden", "keine buchung", "zahlung funktioniert nicht", "zahlung fehlgeschlagen",
+        "nicht überwiesen", "nicht angekommen", "probleme mit zahlung", "überweisung hängt", "zahlung nicht möglich",
+        "zahlung abgelehnt", "konnte nicht zahlen", "buchung nicht durchgeführt", "fehlende zahlung", "problem mit lastschrift",
+        "banküberweisung gescheitert", "nicht gebucht", "zahlungsvorgang fehlerhaft", "betrag nicht abgebucht",
+        "zahlung wurde nicht verarbeitet", "lastschrift fehlgeschlagen", "überweisung nicht angekommen",
+        "zahlung nicht bestätigt", "abbuchung fehlt", "keine bestätigung", "geld nicht übertragen",
+        "buchung offen", "geld nicht gutgeschrieben", "fehlermeldung bei zahlung"
+    ],
+    "Kompliziert / Unklar": [
+        "kompliziert", "nicht verständlich", "nicht intuitiv", "schwer zu verstehen", "unklar", "nicht eindeutig",
+        "umständlich", "nicht nutzerfreundlich", "unverständlich", "verwirrend", "komplizierter vorgang",
+        "nicht nachvollziehbar", "nicht klar erklärt", "unlogisch", "verwirrende navigation", "menü unverständlich",
+        "unklare anleitung", "komplizierte beschreibung", "sperrig", "nicht selbsterklärend",
+        "nicht selbsterklärlich", "verwirrende benennung", "missverständlich", "komplexe struktur",
+        "kein roter faden", "nicht eindeutig beschrieben", "nicht eindeutig erklärt", "nicht selbsterklärende schritte",
+        "nicht klar gegliedert", "undurchsichtig"
+    ],
+    "Feature-Wünsche / Kritik": [
+        "funktion fehlt", "wäre gut", "feature", "nicht vorgesehen", "funktion sollte", "funktion benötigt",
+        "ich wünsche mir", "bitte ergänzen", "könnte man hinzufügen", "nicht verfügbar", "funktion nicht vorhanden",
+        "funktion deaktiviert", "fehlt in der app", "keine möglichkeit", "nicht vorgesehen", "nicht enthalten",
+        "noch nicht verfügbar", "sollte implementiert werden", "gewünschtes feature", "funktion vermisst",
+        "kein button", "nicht auswählbar", "keine option", "option fehlt", "nicht konfigurierbar",
+        "könnte verbessert werden", "wünschenswert", "funktion erweitern", "benutzerwunsch", "nicht freigeschaltet"
+    ],
+    "Sprachprobleme": [
+        "englisch", "nicht auf deutsch", "sprache falsch", "nur englisch", "kein deutsch",
+        "nicht lokalisiert", "übersetzung fehlt", "englische sprache", "sprache ändern",
+        "menü englisch", "texte nicht übersetzt", "nur englische version",
+        "übersetzungsfehler", "falsche sprache", "texte nicht verständlich",
+        "fehlende lokalisierung", "keine deutsche sprache", "falsche sprachversion",
+        "spracheinstellungen fehlen", "menü auf englisch", "fehlende übersetzung",
+        "sprachlich unklar", "kein sprachwechsel", "interface englisch",
+        "nicht auf deutsch verfügbar", "englischer hilfetext", "sprachumschaltung fehlt",
+        "keine lokalisierung", "fehlende sprachwahl", "hilfe nur englisch"
+    ],
+    "Sicherheit": [
+        "sicherheit", "schutz", "sicherheitsproblem", "datenleck", "nicht sicher", "unsicher",
+        "sicherheitsbedenken", "keine 2-faktor", "risiko", "zugriffsproblem",
+        "sicherheitslücke", "keine verschlüsselung", "unsichere verbindung",
+        "unsicherer zugang", "schutz fehlt", "keine passwortabfrage",
+        "fehlende sicherheit", "daten ungeschützt", "authentifizierung unklar",
+        "zugriff ohne sicherheit", "fehlender schutzmechanismus", "kein logout",
+        "automatischer logout fehlt", "keine warnmeldung", "sicherheitsmeldung fehlt",
+        "datenweitergabe", "keine session begrenzung", "session nicht gesichert",
+        "zugangsdaten unverschlüsselt", "zugriffsrechte unklar"
+    ],
+    "Tagesgeld": [
+        "tagesgeld", "zins", "geldanlage", "sparzins", "zinskonto", "zinsen fehlen",
+        "tagesgeldkonto", "keine verzinsung", "tagesgeldrate", "zinsbindung",
+        "verzinsung", "zinsänderung", "tagesgeldkonto nicht sichtbar",
+        "tagesgeld nicht auswählbar", "zins niedrig", "zinsangebot",
+        "anlagezins", "keine zinsinfo", "zins falsch angezeigt",
+        "tagesgeld fehler", "nicht verzinst", "zins fehlt",
+        "tagesgeldrate nicht geändert", "tagesgeldrate nicht angepasst",
+        "zinsbuchung fehlt", "zinsrate falsch", "zins wird nicht berechnet",
+        "tagesgeldkonto fehlt", "keine zinsanpassung", "tagesgeldoption fehlt"
+    ],
+    "Werbung": [
+        "werbung", "angebot", "promo", "aktionscode", "zu viel werbung",
+        "nerversige werbung", "nicht relevant", "spam", "werbeeinblendung",
+        "promotion", "werbeanzeige", "werbebanner", "werbebotschaft",
+        "unpassende werbung", "irrelevante werbung", "werbeaktion",
+        "werbung eingeblendet", "push werbung", "email werbung",
+        "werbung auf startseite", "nicht deaktivierbar", "werbung bei login",
+        "keine option zum abschalten", "störende werbung", "zu viele angebote",
+        "angebote nerven", "werbung in app", "werbung zu präsent",
+        "popup werbung", "unnötige angebote"
+    ],
+    "UI/UX": [
+        "veraltet", "nicht modern", "design alt", "nicht intuitiv",
+        "menüführung schlecht", "layout veraltet", "keine struktur",
+        "nicht übersichtlich", "nicht schön", "altbacken", "altmodisch",
+        "nicht benutzerfreundlich", "unübersichtliches layout",
+        "nicht ansprechend", "veraltetes interface", "kein modernes design",
+        "wirkt alt", "design nicht aktuell", "unmoderne oberfläche",
+        "technisch alt", "nicht responsive", "bedienung veraltet",
+        "style altbacken", "nutzung unkomfortabel", "umständliches layout",
+        "nicht ansehnlich", "elemente zu klein", "zu viel text", "keine icons",
+        "unpraktische darstellung"
+    ],
+    "unübersichtlich": [
+        "unübersichtlich", "nicht klar", "durcheinander", "nicht strukturiert",
+        "keine ordnung", "keine übersicht", "zu komplex", "schlecht aufgebaut",
+        "nicht nachvollziehbar", "layout chaotisch", "verwirrend",
+        "keine menüstruktur", "kein überblick", "unklare gliederung",
+        "unstrukturierte darstellung", "unübersichtliche seite",
+        "navigation schwierig", "kompliziertes menü", "kein roter faden",
+        "menüführung unklar", "fehlende kategorien", "kein filter",
+        "ohne sortierung", "unleserlich", "überladen", "optisch unklar",
+        "nicht gut erkennbar", "kategorie fehlt"
+    ],
+    "langsam": [
+        "langsam", "lädt lange", "dauert ewig", "träge", "reaktionszeit",
+        "verzögert", "ewiges laden", "warten", "verbindung langsam",
+        "nicht flüssig", "app ist träge", "verzögerte reagieren",
+        "ladeprobleme", "app ist langsam", "reagiert langsam",
+        "lange ladezeit", "performanceschwäche", "zu langsam",
+        "langsamer aufbau", "app lädt nicht sofort", "träge benutzung",
+        "startet langsam", "verarbeitung dauert", "menü öffnet langsam",
+        "daten laden ewig", "prozess dauert", "feedback dauert",
+        "anmeldung langsam", "reaktion zu spät", "verarbeitung verzögert"
+    ],
+    "Kundenservice": [
+        "support", "hotline", "rückruf", "keine antwort", "niemand erreichbar",
+        "service schlecht", "lange wartezeit", "kundendienst", "keine hilfe",
+        "service reagiert nicht", "keine unterstützung", "reagiert nicht",
+        "kontakt nicht möglich", "wartezeit", "keine rückmeldung",
+        "telefonisch nicht erreichbar", "keine lösung", "antwort dauert",
+        "kundenberatung fehlt", "keine antwort erhalten", "hotline nicht erreichbar",
+        "keine serviceleistung", "kundensupport schlecht", "kundenbetreuung mangelhaft",
+        "kundenservice reagiert nicht", "service schwer erreichbar", "service antwortet nicht",
+        "nicht geholfen", "unfreundlicher support", "hilft nicht weiter"
+    ],
+    "Kontaktmöglichkeiten": [
+        "ansprechpartner", "kontakt", "rückruf", "nicht erreichbar", "kein kontakt",
+        "keine kontaktdaten", "hilfe fehlt", "kontaktformular", "keine rückmeldung",
+        "support kontakt", "kein formular", "supportformular fehlt",
+        "kundendienst kontaktieren", "telefon fehlt", "email fehlt", "nur hotline",
+        "kontakt schwierig", "kontaktierung unklar", "kontaktoption fehlt",
+        "keine kontaktmöglichkeit", "nicht ansprechbar", "support schwer erreichbar",
+        "kein livechat", "keine supportmail", "anfrage nicht möglich",
+        "kein rückruf erhalten", "kontaktseite leer", "keine kontaktfunktion",
+        "kontaktmöglichkeit nicht ersichtlich", "anfrageformular fehlt"
+    ],
+    "Vertrauenswürdigkeit": [
+        "vertrauen", "abzocke", "nicht seriös", "zweifelhaft", "skepsis",
+        "nicht glaubwürdig", "unsicher", "nicht transparent", "betrugsverdacht",
+        "nicht vertrauenswürdig", "datensicherheit", "nicht nachvollziehbar",
+        "intransparente kosten", "unseriös", "abzocker", "misstrauen",
+        "unsicheres gefühl", "nicht überprüfbar", "unvollständig",
+        "zweifelhaftes angebot", "kein impressum", "keine transparenz",
+        "zweifelhaftes verhalten", "verdacht auf betrug", "unsichere kommunikation",
+        "fehlende datensicherheit", "keine aufklärung", "unzuverlässig",
+        "fragwürdig", "irreführend"
+    ],
+    "Gebühren": [
+        "gebühr", "zinsen", "bearbeitungsgebühr", "kosten", "preis", "zu teuer",
+        "gebühren nicht klar", "versteckte kosten", "nicht kostenlos",
+        "zusatzkosten", "gebühren unklar", "bankgebühren",
+        "gebührenerhöhung", "nicht transparent", "kosten zu hoch",
+        "gebührenänderung", "kontoführungsgebühr", "auszahlungsgebühr",
+        "transaktionsgebühr", "gebühr zu hoch", "zu hohe zinsen",
+        "gebühreninfo fehlt", "unverhältnismäßige gebühr", "gebühr nicht nachvollziehbar",
+        "entgelt", "gebührenbelastung", "gebühr nicht verständlich",
+        "servicegebühr", "provision", "kostenaufstellung fehlt"
+    ]
+}
+
+
+# --- Regeln ---
+def load_rules(path: Path = RULES_PATH) -> dict[str, list[str]]:
+    """Liest die Regeln (legt die Datei mit Defaults an, falls sie fehlt)."""
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(DEFAULT_RULES, indent=2, ensure_ascii=False), encoding="utf-8")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    # Ergänze fehlende Defaults
+    for cat, terms in DEFAULT_RULES.items():
+        data.setdefault(cat, terms.copy())
+    return data
+
+
+def write_rules(rules: dict[str, list[str]], path: Path = RULES_PATH) -> None:
+    path.write_text(json.dumps(rules, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+# --- Kategorisierung ---
+def build_patterns(rules: dict[str, list[str]]) -> RuleMatcher:
+    """Kompiliert alle Regeln in einen gemeinsamen Matcher."""
+    return RuleMatcher(rules)
+
+
+def categorize_series(feedback: pd.Series, patterns: RuleMatcher | ParallelCategorizer,
+                      cache: ResultCache | None = None, version: str = "",
+                      normalize: bool = False) -> pd.Series:
+    """
+    Ein einziger Durchlauf pro eindeutigem Text; erste passende Kategorie gewinnt.
+    Mit ``normalize`` werden die Texte vorher normalisiert (``patterns`` muss dann
+    aus ``normalize_rules`` stammen). Mit ``cache`` werden nur Texte kategorisiert,
+    die für ``version`` noch unbekannt sind.
+    """
+    codes, uniques = dedupe_texts(feedback, normalize)
+    if cache is None:
+        labels = patterns.categorize(uniques)
+    else:
+        labels = cache.categorize(uniques, version, patterns.categorize)
+    return pd.Series(np.asarray(labels, dtype=object)[codes], index=feedback.index, name='Kategorie')
+
+
+# --- Batch-CLI ---
+class _ChunkWriter:
+    """Schreibt gelabelte Chunks fortlaufend als CSV, JSON Lines oder Parquet."""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.kind = "csv" if target == "-" else file_type(target)
+        if self.kind not in ("csv", "jsonl", "parquet"):
+            raise ValueError(f"Nicht unterstütztes Ausgabeformat: {target}")
+        self._fh: IO[str] | None = None
+        self._parquet = None
+        self._first = True
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.kind == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.target, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+            return
+        if self._fh is None:
+            self._fh = sys.stdout if self.target == "-" else open(self.target, "w", encoding="utf-8", newline="")
+        if self.kind == "csv":
+            chunk.to_csv(self._fh, index=False, header=self._first)
+        else:
+            text = chunk.to_json(orient="records", lines=True, force_ascii=False)
+            self._fh.write(text if text.endswith("\n") else text + "\n")
+        self._first = False
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._fh is not None and self._fh is not sys.stdout:
+            self._fh.close()
+
+
+def iter_labeled(paths: list[str], patterns: RuleMatcher | ParallelCategorizer, column: str = "Feedback",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, cache: ResultCache | None = None,
+                 version: str = "", normalize: bool = False) -> Iterator[pd.DataFrame]:
+    """Liest alle Dateien chunkweise und hängt die Spalte 'Kategorie' an."""
+    for path in paths:
+        for chunk in iter_chunks(path, path, chunk_size):
+            if column not in chunk.columns:
+                raise ValueError(f"Spalte '{column}' nicht gefunden in {path}")
+            chunk['Kategorie'] = categorize_series(chunk[column].astype(str), patterns, cache, version, normalize)
+            yield chunk
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m categorizer",
+        description="Kategorisiert Feedback-Dateien (xlsx/csv/parquet/jsonl) ohne Streamlit.",
+    )
+    parser.add_argument("inputs", nargs="+", help="Eingabedateien")
+    parser.add_argument("-o", "--output", default="-", help="Ausgabe (.csv, .jsonl, .parquet; '-' = CSV auf stdout)")
+    parser.add_argument("--column", default="Feedback", help="Textspalte (Default: Feedback)")
+    parser.add_argument("--rules", type=Path, default=RULES_PATH, help="Regeldatei (JSON)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Worker-Prozesse (Default: 1)")
+    parser.add_argument("--no-normalize", action="store_true", help="Texte nicht normalisieren")
+    parser.add_argument("--cache", type=Path, help="Ergebnis-Cache (SQLite) verwenden")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Keine Fortschrittsausgabe")
+    args = parser.parse_args(argv)
+
+    normalize = not args.no_normalize
+    rules = load_rules(args.rules)
+    match_rules = normalize_rules(rules) if normalize else rules
+    patterns = build_patterns(match_rules)
+    categorizer = ParallelCategorizer(match_rules, workers=args.workers, matcher=patterns)
+    cache = ResultCache(args.cache) if args.cache else None
+
+    writer = _ChunkWriter(args.output)
+    done = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_labeled(args.inputs, categorizer, args.column, args.chunk_size,
+                                  cache, rules_hash(match_rules), normalize):
+            writer.write(chunk)
+            done += len(chunk)
+            if not args.quiet:
+                elapsed = time.perf_counter() - start
+                print(f"\r{done:,} Zeilen kategorisiert ({done / max(elapsed, 1e-9):,.0f} Zeilen/s)",
+                      end="", file=sys.stderr, flush=True)
+    except (OSError, ValueError) as e:
+        print(f"\nFehler: {e}", file=sys.stderr)
+        return 1
+    finally:
+        writer.close()
+        categorizer.close()
+        if cache is not None:
+            cache.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
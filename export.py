@@ -0,0 +1,97 @@
+"""
+Export der kategorisierten Daten als Excel, Parquet, CSV oder gzip-CSV.
+
+Excel wird zeilenweise mit xlsxwriter im ``constant_memory``-Modus
+geschrieben (jede Zeile wird sofort auf die Platte ausgelagert), statt erst
+ein komplettes openpyxl-Workbook im Speicher aufzubauen. Ohne xlsxwriter wird
+auf openpyxl im write-only-Modus ausgewichen.
+"""
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXCEL_MAX_ROWS = 1_048_576
+
+# Anzeigename -> (Dateiendung, MIME-Typ)
+FORMATS = {
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _cell_columns(df: pd.DataFrame) -> list[list]:
+    """Spalten als Python-Listen; NaN/None werden zu leeren Zellen."""
+    cols = []
+    for name in df.columns:
+        values = df[name].astype(object).to_numpy()
+        mask = pd.isna(values)
+        if mask.any():
+            values = np.where(mask, None, values)
+        cols.append(values.tolist())
+    return cols
+
+
+def to_xlsx(df: pd.DataFrame, sheet_name: str = "Kategorien") -> bytes:
+    if len(df) >= EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel erlaubt höchstens {EXCEL_MAX_ROWS - 1:,} Datenzeilen – bitte CSV oder Parquet wählen")
+    buf = io.BytesIO()
+    header = [str(c) for c in df.columns]
+    if xlsxwriter is None:
+        from openpyxl import Workbook  # Fallback: write-only hält ebenfalls nur wenige Zeilen im Speicher
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(sheet_name)
+        ws.append(header)
+        for row in zip(*_cell_columns(df)):
+            ws.append(row)
+        wb.save(buf)
+        return buf.getvalue()
+
+    wb = xlsxwriter.Workbook(buf, {"constant_memory": True, "strings_to_urls": False,
+                                   "strings_to_formulas": False, "nan_inf_to_errors": True})
+    ws = wb.add_worksheet(sheet_name)
+    ws.write_row(0, 0, header)
+    write_row = ws.write_row
+    for i, row in enumerate(zip(*_cell_columns(df)), start=1):
+        write_row(i, 0, row)
+    wb.close()
+    return buf.getvalue()
+
+
+def to_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def to_csv_gz(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    # Niedrige Stufe: kaum größer als 9, aber ein Vielfaches schneller
+    with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=3, mtime=0) as gz:
+        with io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+            df.to_csv(text, index=False)
+    return buf.getvalue()
+
+
+def to_parquet(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    try:
+        df.to_parquet(buf, index=False, compression="zstd")
+    except ImportError as e:
+        raise ValueError("Parquet-Export benötigt pyarrow") from e
+    return buf.getvalue()
+
+
+_WRITERS = {"Excel": to_xlsx, "CSV": to_csv, "CSV (gzip)": to_csv_gz, "Parquet": to_parquet}
+
+
+def export(df: pd.DataFrame, fmt: str) -> bytes:
+    """Erzeugt die Exportdatei im Format ``fmt`` (Schlüssel aus FORMATS)."""
+    return _WRITERS[fmt](df)
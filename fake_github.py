@@ -0,0 +1,172 @@
+"""
+Minimaler Fake der GitHub-Contents-API für lokale Tests von github_sync.py.
+
+Unterstützt genau das, was der Sync braucht:
+
+    GET  /repos/{owner}/{repo}                   Repo-Metadaten
+    GET  /repos/{owner}/{repo}/contents/{path}   Datei (base64) samt Blob-SHA, sonst 404
+    PUT  /repos/{owner}/{repo}/contents/{path}   Anlegen/Aktualisieren; falscher SHA -> 409
+    GET  /_fake/state                            Anzahl Commits und aktuelle Dateien
+    POST /_fake/edit/{path}                      Datei "von anderer Seite" ändern (Konflikt testen)
+
+Mit ``--fail-rate`` antworten zufällige Anfragen mit 502, ``--latency`` verzögert
+jede Antwort (Backoff und Bündelung testen).
+
+    python fake_github.py --port 8765
+    # .streamlit/secrets.toml:
+    #   GITHUB_TOKEN = "fake"
+    #   REPO_NAME = "demo/feedback"
+    #   GITHUB_BASE_URL = "http://127.0.0.1:8765"
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGitHub:
+    def __init__(self, fail_rate: float = 0.0, latency: float = 0.0):
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.files: dict[tuple[str, str], tuple[bytes, str]] = {}  # (repo, path) -> (Inhalt, Blob-SHA)
+        self.commits: list[dict] = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def blob_sha(content: bytes) -> str:
+        return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+    def write(self, repo: str, path: str, content: bytes, message: str) -> tuple[str, str]:
+        sha = self.blob_sha(content)
+        self.files[(repo, path)] = (content, sha)
+        commit = hashlib.sha1(f"{len(self.commits)}:{repo}:{path}:{sha}".encode()).hexdigest()
+        self.commits.append({"sha": commit, "repo": repo, "path": path, "message": message, "time": time.time()})
+        return sha, commit
+
+
+def make_handler(fake: FakeGitHub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def _base(self) -> str:
+            return f"http://{self.headers.get('Host', '127.0.0.1')}"
+
+        def _content_json(self, repo: str, path: str, content: bytes, sha: str) -> dict:
+            url = f"{self._base()}/repos/{repo}/contents/{path}"
+            return {"type": "file", "encoding": "base64", "name": path.rsplit("/", 1)[-1], "path": path,
+                    "sha": sha, "size": len(content), "url": url,
+                    "content": base64.b64encode(content).decode("ascii")}
+
+        def _route(self, method: str) -> None:
+            if fake.latency:
+                time.sleep(fake.latency)
+            body = self._body() if method in ("PUT", "POST") else {}
+            url = self.path.split("?")[0]
+            if url == "/_fake/state":
+                with fake.lock:
+                    return self._send(200, {"commits": fake.commits,
+                                            "files": {f"{r}/{p}": s for (r, p), (_, s) in fake.files.items()}})
+            if not url.startswith("/_fake/") and fake.fail_rate and random.random() < fake.fail_rate:
+                return self._send(502, {"message": "Server Error (fake)"})
+            parts = url.strip("/").split("/")
+            if method == "POST" and parts[:2] == ["_fake", "edit"] and len(parts) > 2:
+                # Remote-Änderung simulieren: an die passende Datei einen Zeilenumbruch anhängen
+                path = "/".join(parts[2:])
+                with fake.lock:
+                    for (repo, p), (content, _) in list(fake.files.items()):
+                        if p == path:
+                            sha, _ = fake.write(repo, p, content + b"\n", "remote edit")
+                            return self._send(200, {"sha": sha})
+                return self._send(404, {"message": "Not Found"})
+            if len(parts) < 3 or parts[0] != "repos":
+                return self._send(404, {"message": "Not Found"})
+            repo = f"{parts[1]}/{parts[2]}"
+            if len(parts) == 3 and method == "GET":
+                owner, name = parts[1], parts[2]
+                return self._send(200, {"id": 1, "name": name, "full_name": repo, "owner": {"login": owner},
+                                        "url": f"{self._base()}/repos/{repo}", "default_branch": "main"})
+            if len(parts) < 5 or parts[3] != "contents":
+                return self._send(404, {"message": "Not Found"})
+            path = "/".join(parts[4:])
+            with fake.lock:
+                current = fake.files.get((repo, path))
+                if method == "GET":
+                    if current is None:
+                        return self._send(404, {"message": "Not Found"})
+                    return self._send(200, self._content_json(repo, path, *current))
+                if method != "PUT":
+                    return self._send(405, {"message": "Method Not Allowed"})
+                given = body.get("sha")
+                if current is None and given:
+                    return self._send(404, {"message": "Not Found"})
+                if current is not None and not given:
+                    return self._send(422, {"message": "Invalid request. \"sha\" wasn't supplied."})
+                if current is not None and given != current[1]:
+                    return self._send(409, {"message": f"{path} does not match {given}"})
+                content = base64.b64decode(body.get("content", ""))
+                sha, commit = fake.write(repo, path, content, body.get("message", ""))
+                status = 200 if current is not None else 201
+                return self._send(status, {
+                    "content": self._content_json(repo, path, content, sha),
+                    "commit": {"sha": commit, "message": body.get("message", ""),
+                               "url": f"{self._base()}/repos/{repo}/git/commits/{commit}"},
+                })
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_PUT(self):
+            self._route("PUT")
+
+        def do_POST(self):
+            self._route("POST")
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, fail_rate: float = 0.0,
+          latency: float = 0.0) -> tuple[ThreadingHTTPServer, FakeGitHub]:
+    """Startet den Fake im Hintergrund-Thread (für Tests); Rückgabe: (Server, Zustand)."""
+    fake = FakeGitHub(fail_rate, latency)
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fake
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Anteil der Anfragen, die mit 502 antworten")
+    parser.add_argument("--latency", type=float, default=0.0, help="Verzögerung je Antwort in Sekunden")
+    args = parser.parse_args()
+    fake = FakeGitHub(args.fail_rate, args.latency)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"Fake-GitHub läuft auf http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
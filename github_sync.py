@@ -0,0 +1,205 @@
+"""
+Hintergrund-Synchronisation der Regeldatei nach GitHub.
+
+``save_rules`` blockiert damit nicht mehr auf der GitHub-API: Speichervorgänge
+werden nur vorgemerkt, ein Worker-Thread wartet eine kurze Ruhephase ab
+(mehrere schnelle Speichervorgänge ergeben einen einzigen Commit) und pusht
+dann den jeweils neuesten Stand. Der GitHub-Client samt HTTP-Verbindungspool
+wird wiederverwendet, vorübergehende Fehler (5xx, 429, Netzwerk) werden mit
+exponentiellem Backoff wiederholt.
+
+Der zuletzt bekannte Blob-SHA wird mitgeführt. Wurde die Datei zwischenzeitlich
+von anderer Seite geändert, meldet GitHub einen Konflikt (409); dann wird nicht
+überschrieben, sondern der Status "Konflikt" gemeldet, bis ein Push mit
+``force=True`` angestoßen wird.
+
+Zum Testen ohne echtes GitHub: ``python fake_github.py`` starten und
+``GITHUB_BASE_URL = "http://127.0.0.1:8765"`` in den Secrets setzen.
+"""
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+
+try:
+    from github import Auth, Github, GithubException
+except ImportError:
+    Github = None
+    GithubException = Exception
+
+DEFAULT_BASE_URL = "https://api.github.com"
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_MAX_RETRIES = 5
+
+# Zustände für die Anzeige
+IDLE, PENDING, PUSHING, RETRYING, SYNCED, CONFLICT, FAILED, DISABLED = (
+    "idle", "pending", "pushing", "retrying", "synced", "conflict", "failed", "disabled")
+
+
+class SyncConflict(Exception):
+    """Die Datei wurde auf GitHub seit dem letzten bekannten Stand geändert."""
+
+
+@dataclass(frozen=True)
+class SyncStatus:
+    state: str = IDLE
+    message: str = ""
+    updated: float = 0.0
+    commit: str | None = None
+    attempts: int = 0
+    coalesced: int = 0  # Speichervorgänge, die im letzten Commit zusammengefasst wurden
+
+
+def _retryable(exc: Exception) -> bool:
+    status = getattr(exc, "status", None)
+    if status is None:
+        # Netzwerkfehler (requests/urllib3) haben keinen HTTP-Status
+        return not isinstance(exc, (ValueError, TypeError))
+    return status >= 500 or status == 429 or (status == 403 and "rate limit" in str(exc).lower())
+
+
+class GitHubSync:
+    """Worker-Thread, der Regel-Speichervorgänge gebündelt nach GitHub pusht."""
+
+    def __init__(self, token: str | None, repo_name: str | None, path: str = "data/custom_rules.json",
+                 base_url: str | None = None, debounce: float = DEFAULT_DEBOUNCE,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = 1.0, max_backoff: float = 30.0,
+                 metrics=None):
+        self.repo_name = repo_name
+        self.path = path
+        self.debounce = debounce
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics
+        self.enabled = bool(Github and token and repo_name)
+        self._client = None
+        if self.enabled:
+            # Ein Client für alle Pushes: requests-Session mit Keep-Alive; Wiederholungen macht der Worker selbst
+            self._client = Github(auth=Auth.Token(token), base_url=(base_url or DEFAULT_BASE_URL).rstrip("/"),
+                                  retry=None, pool_size=2, seconds_between_requests=None, seconds_between_writes=None,
+                                  lazy=True)
+        self._repo = None
+        self._sha: str | None = None
+        self._pending: str | None = None
+        self._force = False
+        self._saves = 0
+        self._due = 0.0
+        self._cond = threading.Condition()
+        self.status = SyncStatus(state=IDLE if self.enabled else DISABLED,
+                                 message="" if self.enabled else "GitHub-Sync deaktiviert (fehlende Konfiguration)")
+        self._thread: threading.Thread | None = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="github-sync", daemon=True)
+            self._thread.start()
+
+    # --- API für die App ---
+    def submit(self, rules: dict[str, list[str]], force: bool = False) -> None:
+        """Merkt den Stand zum Push vor; ein erneuter Aufruf innerhalb der Ruhephase ersetzt ihn."""
+        if not self.enabled:
+            return
+        content = json.dumps(rules, indent=2, ensure_ascii=False)
+        with self._cond:
+            self._pending = content
+            self._force = self._force or force
+            self._saves += 1
+            self._due = time.monotonic() + self.debounce
+            self._set(PENDING, f"{self._saves} Änderung(en) warten auf Push")
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 30.0) -> SyncStatus:
+        """Pusht Vorgemerktes sofort und wartet auf das Ergebnis (für Tests/Shutdown)."""
+        with self._cond:
+            self._due = time.monotonic()
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._pending is None and self.status.state not in (PUSHING, RETRYING, PENDING),
+                                timeout)
+        return self.status
+
+    # --- Worker ---
+    def _set(self, state: str, message: str, **changes) -> None:
+        self.status = replace(self.status, state=state, message=message, updated=time.time(), **changes)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None or time.monotonic() < self._due:
+                    self._cond.wait(None if self._pending is None else self._due - time.monotonic())
+                content, force, saves = self._pending, self._force, self._saves
+                self._pending, self._force, self._saves = None, False, 0
+                self._set(PUSHING, "Pushe Regeln zu GitHub...", coalesced=saves, attempts=0)
+            self._push(content, force, saves)
+            with self._cond:
+                self._cond.notify_all()
+
+    def _push(self, content: str, force: bool, saves: int) -> None:
+        t0 = time.perf_counter()
+        try:
+            self._push_with_retries(content, force, saves)
+        finally:
+            if self.metrics is not None:
+                self.metrics.record("push_rules_to_github", "github-sync", time.time(), time.perf_counter() - t0)
+
+    def _push_with_retries(self, content: str, force: bool, saves: int) -> None:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                commit = self._push_once(content, force)
+            except SyncConflict as e:
+                self._set(CONFLICT, str(e), attempts=attempt)
+                return
+            except Exception as e:
+                if not _retryable(e) or attempt == self.max_retries:
+                    self._set(FAILED, f"Push fehlgeschlagen: {e}", attempts=attempt)
+                    return
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * (0.5 + random.random() / 2)
+                self._set(RETRYING, f"Fehler ({e}), neuer Versuch in {delay:.1f}s", attempts=attempt)
+                with self._cond:
+                    # Kommt währenddessen ein neuerer Stand, wird stattdessen dieser gepusht
+                    if self._cond.wait_for(lambda: self._pending is not None, delay):
+                        self._force = self._force or force
+                        self._saves += saves
+                        self._set(PENDING, "Neuerer Stand vorgemerkt")
+                        return
+                continue
+            if commit is None:
+                self._set(SYNCED, "GitHub ist bereits aktuell.", attempts=attempt)
+            else:
+                self._set(SYNCED, f"custom_rules.json gepusht ({saves} Änderung(en) in einem Commit).",
+                          commit=commit, attempts=attempt)
+            return
+
+    def _push_once(self, content: str, force: bool) -> str | None:
+        """Ein Push-Versuch; liefert den Commit-SHA oder None, wenn nichts zu tun war."""
+        if self._repo is None:
+            self._repo = self._client.get_repo(self.repo_name)  # lazy: kein GET auf das Repo
+        repo = self._repo
+        if self._sha is None or force:
+            try:
+                existing = repo.get_contents(self.path)
+                self._sha = existing.sha
+                if existing.decoded_content.decode("utf-8") == content:
+                    return None
+            except GithubException as e:
+                if getattr(e, "status", None) != 404:
+                    raise
+                self._sha = None
+        try:
+            if self._sha is None:
+                result = repo.create_file(self.path, "[Streamlit] Create rules", content)
+            else:
+                result = repo.update_file(self.path, "[Streamlit] Update rules", content, self._sha)
+        except GithubException as e:
+            # 409: SHA veraltet; 422 beim Anlegen: Datei existiert inzwischen
+            if getattr(e, "status", None) in (409, 422):
+                remote = repo.get_contents(self.path)
+                if remote.decoded_content.decode("utf-8") == content:
+                    self._sha = remote.sha
+                    return None
+                raise SyncConflict(
+                    f"Konflikt: {self.path} wurde auf GitHub geändert (Remote-SHA {remote.sha[:7]}). "
+                    "Erneut mit Überschreiben pushen oder Regeln abgleichen."
+                ) from e
+            raise
+        self._sha = result["content"].sha
+        return result["commit"].sha
@@ -0,0 +1,181 @@
+"""
+Append-only Verlauf aller kategorisierten Uploads (Parquet, nach Monat partitioniert).
+
+Pro Upload wird genau eine Datei ``month=YYYY-MM/YYYYMMDD-<upload_id>.parquet``
+geschrieben (Spalten: upload_date, upload_id, text_hash, category,
+rules_version). Bestehende Dateien werden nie verändert; nur wenn ein Upload
+ausdrücklich unter einem anderen Datum neu abgelegt wird, ersetzt die neue
+Datei die alte.
+
+Zusätzlich stehen die Kategorie-Zählungen des Uploads als Metadaten im
+Parquet-Footer. Trends über viele Monate werden daraus berechnet, ohne die
+Spaltendaten zu lesen; nur Detailabfragen lesen Spalten (memory-mapped und
+per Partition bzw. Row-Group-Statistik auf den Zeitraum eingeschränkt).
+"""
+import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from categorizer import BASE_DIR
+from normalize import dedupe_texts
+from result_cache import text_hash
+
+HISTORY_DIR = BASE_DIR / "data" / "history"
+_META_KEY = b"feedback_history"
+
+FREQUENCIES = {"Monat": "M", "Woche": "W", "Tag": "D"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Der Verlauf benötigt pyarrow") from e
+    return pa, pq
+
+
+def upload_id(data: bytes) -> str:
+    """Kennung eines Uploads aus dem Dateiinhalt (gleiche Datei = gleiche ID)."""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _files(root: Path) -> list[Path]:
+    return sorted(root.glob("month=*/*.parquet"))
+
+
+def _upload_files(uid: str, root: Path) -> list[Path]:
+    return sorted(root.glob(f"month=*/*-{uid}.parquet"))
+
+
+def has_upload(uid: str, root: Path = HISTORY_DIR) -> bool:
+    return bool(_upload_files(uid, root))
+
+
+def stored_date(uid: str, root: Path = HISTORY_DIR) -> datetime.date | None:
+    """Datum, unter dem der Upload im Verlauf liegt (None, wenn nicht gespeichert)."""
+    files = _upload_files(uid, root)
+    return datetime.datetime.strptime(files[0].name[:8], "%Y%m%d").date() if files else None
+
+
+def append_upload(feedback: pd.Series, categories: pd.Series, uid: str, upload_date: datetime.date,
+                  rules_version: str, root: Path = HISTORY_DIR, replace: bool = False) -> Path | None:
+    """
+    Schreibt einen Upload in den Verlauf. Ist die Datei (``uid``) bereits
+    enthalten, passiert nichts und es wird None zurückgegeben – außer mit
+    ``replace=True``: dann ersetzt der neue Eintrag (z. B. mit korrigiertem
+    Datum) den alten.
+    """
+    pa, pq = _pyarrow()
+    existing = _upload_files(uid, root)
+    if existing and not replace:
+        return None
+    n = len(feedback)
+    # Hash nur einmal pro eindeutigem Text
+    codes, uniques = dedupe_texts(feedback.astype(str), normalize=False)
+    hashes = np.array([text_hash(t) for t in uniques], dtype=object)[codes] if n else []
+    labels = categories.astype(str).to_numpy(dtype=object)
+    table = pa.table({
+        "upload_date": pa.array(np.full(n, np.datetime64(upload_date, "D"))).cast(pa.date32()),
+        "upload_id": pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), [uid]),
+        "text_hash": pa.array(hashes, type=pa.binary(16)),
+        "category": pa.array(labels, type=pa.string()).dictionary_encode(),
+        "rules_version": pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), [rules_version]),
+    })
+    summary = {
+        "upload_id": uid,
+        "upload_date": upload_date.isoformat(),
+        "rules_version": rules_version,
+        "rows": n,
+        "counts": {str(k): int(v) for k, v in pd.Series(labels).value_counts().items()},
+    }
+    table = table.replace_schema_metadata({_META_KEY: json.dumps(summary, ensure_ascii=False).encode("utf-8")})
+
+    path = root / f"month={upload_date:%Y-%m}" / f"{upload_date:%Y%m%d}-{uid}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)  # atomar: Leser sehen nie eine halbe Datei
+    for old in existing:
+        if old != path:
+            old.unlink(missing_ok=True)
+            if not any(old.parent.iterdir()):
+                old.parent.rmdir()
+    return path
+
+
+def _summary(path: Path) -> dict:
+    """Zählungen aus dem Footer; ältere Dateien ohne Metadaten werden einmal gescannt."""
+    _, pq = _pyarrow()
+    meta = pq.read_schema(path, memory_map=True).metadata or {}
+    if _META_KEY in meta:
+        return json.loads(meta[_META_KEY])
+    table = pq.read_table(path, columns=["upload_date", "upload_id", "rules_version", "category"], memory_map=True)
+    df = table.to_pandas()
+    return {
+        "upload_id": str(df["upload_id"].iloc[0]),
+        "upload_date": pd.Timestamp(df["upload_date"].iloc[0]).date().isoformat(),
+        "rules_version": str(df["rules_version"].iloc[0]),
+        "rows": len(df),
+        "counts": df["category"].astype(str).value_counts().to_dict(),
+    }
+
+
+def upload_summaries(root: Path = HISTORY_DIR) -> pd.DataFrame:
+    """Eine Zeile pro (Upload, Kategorie) mit Datum, Regel-Version und Anzahl."""
+    records = []
+    for path in _files(root):
+        s = _summary(path)
+        for cat, count in s["counts"].items():
+            records.append((pd.Timestamp(s["upload_date"]), s["upload_id"], s["rules_version"], cat, count))
+    return pd.DataFrame(records, columns=["Datum", "Upload", "Regel-Version", "Kategorie", "Anzahl"])
+
+
+def category_trend(freq: str = "M", root: Path = HISTORY_DIR, start: datetime.date | None = None,
+                   end: datetime.date | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Anzahl und Anteil (%) je Kategorie pro Zeitraum (``freq``: "M", "W" oder "D").
+    Liefert (counts, shares) mit Zeiträumen als Index und Kategorien als Spalten.
+    """
+    summaries = upload_summaries(root)
+    if start is not None:
+        summaries = summaries[summaries["Datum"] >= pd.Timestamp(start)]
+    if end is not None:
+        summaries = summaries[summaries["Datum"] <= pd.Timestamp(end)]
+    if summaries.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    period = summaries["Datum"].dt.to_period(freq).dt.start_time.rename("Zeitraum")
+    counts = summaries.pivot_table(index=period, columns="Kategorie", values="Anzahl", aggfunc="sum", fill_value=0)
+    shares = counts.div(counts.sum(axis=1), axis=0).mul(100)
+    return counts, shares
+
+
+def load_history(columns: list[str] | None = None, start: datetime.date | None = None,
+                 end: datetime.date | None = None, root: Path = HISTORY_DIR) -> pd.DataFrame:
+    """
+    Liest Datensätze des Zeitraums memory-mapped. Monats-Partitionen außerhalb
+    des Zeitraums und Row-Groups mit unpassender Datums-Statistik werden übersprungen.
+    """
+    pa, _ = _pyarrow()
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+
+    files = _files(root)
+    if not files:
+        return pd.DataFrame(columns=columns or ["upload_date", "upload_id", "text_hash", "category", "rules_version"])
+    dataset = ds.dataset([str(p) for p in files], format="parquet",
+                         filesystem=pafs.LocalFileSystem(use_mmap=True),
+                         partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+                         partition_base_dir=str(root))
+    expr = None
+    if start is not None:
+        expr = (ds.field("month") >= f"{start:%Y-%m}") & (ds.field("upload_date") >= pa.scalar(start, pa.date32()))
+    if end is not None:
+        upper = (ds.field("month") <= f"{end:%Y-%m}") & (ds.field("upload_date") <= pa.scalar(end, pa.date32()))
+        expr = upper if expr is None else expr & upper
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
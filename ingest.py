@@ -0,0 +1,112 @@
+"""
+Streaming-Einlesen großer Uploads (xlsx, csv, parquet, jsonl) in Chunks fester Größe.
+
+Excel wird über openpyxl im read-only-Modus zeilenweise gelesen, CSV und
+JSON Lines über ``pd.read_csv``/``pd.read_json`` mit ``chunksize`` und
+Parquet batchweise über pyarrow. Der Speicherbedarf beim Einlesen hängt damit
+von der Chunk-Größe ab, nicht von der Dateigröße.
+"""
+from pathlib import Path
+from typing import IO, Iterator
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 50_000
+SUPPORTED_TYPES = ["xlsx", "csv", "parquet", "jsonl"]
+
+
+def file_type(name: str) -> str:
+    """Dateityp anhand der Endung (ohne Punkt, klein geschrieben)."""
+    return Path(name).suffix.lower().lstrip(".")
+
+
+def iter_chunks(source: str | Path | IO[bytes], name: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Liefert die Datei als Folge von DataFrames mit höchstens ``chunk_size`` Zeilen.
+    ``name`` bestimmt das Format (bei Uploads der ursprüngliche Dateiname).
+    """
+    kind = file_type(name)
+    if kind == "xlsx":
+        yield from _iter_xlsx(source, chunk_size)
+    elif kind == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_size)
+    elif kind == "parquet":
+        yield from _iter_parquet(source, chunk_size)
+    elif kind == "jsonl":
+        yield from pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        raise ValueError(f"Nicht unterstütztes Dateiformat: {name}")
+
+
+def estimate_rows(source: str | Path | IO[bytes], name: str) -> int | None:
+    """
+    Zeilenzahl aus den Metadaten (für den Fortschrittsbalken), sonst None. Bei
+    xlsx eine obere Schranke: formatierte Leerzeilen am Ende zählen mit.
+    """
+    kind = file_type(name)
+    try:
+        if kind == "xlsx":
+            from openpyxl import load_workbook
+            wb = load_workbook(source, read_only=True)
+            try:
+                max_row = wb.active.max_row
+            finally:
+                wb.close()
+            return max_row - 1 if max_row else None
+        if kind == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(source).metadata.num_rows
+    except Exception:
+        return None
+    finally:
+        if hasattr(source, "seek"):
+            source.seek(0)
+    return None
+
+
+def _iter_xlsx(source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook  # setzt openpyxl voraus
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        width = len(columns)
+        empty = (None,) * width
+        buf: list[tuple] = []
+        # Leere Zeilen erst übernehmen, wenn noch eine gefüllte folgt: formatierte,
+        # aber leere Zeilen am Tabellenende verwirft pd.read_excel ebenfalls
+        blank = 0
+        for row in rows:
+            # read-only liefert teils kürzere/längere Zeilen als der Header
+            if len(row) != width:
+                row = (tuple(row) + empty)[:width]
+            if row == empty:
+                blank += 1
+                continue
+            while blank:
+                buf.append(empty)
+                blank -= 1
+                if len(buf) >= chunk_size:
+                    yield pd.DataFrame.from_records(buf, columns=columns)
+                    buf = []
+            buf.append(row)
+            if len(buf) >= chunk_size:
+                yield pd.DataFrame.from_records(buf, columns=columns)
+                buf = []
+        if buf:
+            yield pd.DataFrame.from_records(buf, columns=columns)
+    finally:
+        wb.close()
+
+
+def _iter_parquet(source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Parquet-Import benötigt pyarrow") from e
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
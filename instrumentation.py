@@ -0,0 +1,182 @@
+"""
+Zeitmessung der teuren Schritte (Einlesen, Regeln kompilieren, Kategorisieren,
+Diagramm, GitHub-Push) und optionales Profiling eines einzelnen Reruns.
+
+Pro Schritt werden Laufzeit (Wanduhr), verarbeitete Zeilen und die Änderung
+des Prozess-Speichers (RSS) erfasst. Die Messwerte lassen sich im
+Prometheus-Textformat oder als JSON Lines exportieren.
+"""
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:
+    _Pyinstrument = None
+
+DEFAULT_MAX_RECORDS = 2000
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int | None:
+    """Aktueller Speicherbedarf des Prozesses (RSS) oder None, falls nicht ermittelbar."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    run: str
+    started: float
+    seconds: float
+    rows: int | None
+    memory_delta: int | None
+
+
+class StageMetrics:
+    """
+    Prozessweiter, threadsicherer Speicher für Messwerte. Einzelmessungen
+    werden in einem Ringpuffer gehalten, Summen pro Schritt laufen mit.
+    """
+
+    def __init__(self, max_records: int = DEFAULT_MAX_RECORDS):
+        self.records: deque[StageRecord] = deque(maxlen=max_records)
+        self.totals: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, run: str, started: float, seconds: float,
+               rows: int | None = None, memory_delta: int | None = None) -> StageRecord:
+        rec = StageRecord(stage, run, started, seconds, rows, memory_delta)
+        with self._lock:
+            self.records.append(rec)
+            total = self.totals.setdefault(stage, {"count": 0, "seconds": 0.0, "rows": 0})
+            total["count"] += 1
+            total["seconds"] += seconds
+            total["rows"] += rows or 0
+        return rec
+
+    @contextlib.contextmanager
+    def stage(self, name: str, run: str = "", rows: int | None = None) -> Iterator[dict]:
+        """
+        Misst den Block. Die Zeilenzahl kann vorab übergeben oder im Block
+        über das gelieferte Dict gesetzt werden (``info["rows"] = n``).
+        """
+        info = {"rows": rows}
+        mem_before = rss_bytes()
+        started = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - t0
+            mem_after = rss_bytes()
+            delta = mem_after - mem_before if mem_before is not None and mem_after is not None else None
+            self.record(name, run, started, seconds, info["rows"], delta)
+
+    def timed_iter(self, name: str, items: Iterable, run: str = "") -> Iterator:
+        """
+        Misst nur die Zeit in ``next()`` eines Iterators (z. B. Chunk-Einlesen)
+        und verbucht sie als ein Schritt mit der Summe der Zeilen (``len``).
+        """
+        seconds, rows = 0.0, 0
+        mem_before = rss_bytes()
+        started = time.time()
+        it = iter(items)
+        try:
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    seconds += time.perf_counter() - t0
+                    break
+                seconds += time.perf_counter() - t0
+                rows += len(item)
+                yield item
+        finally:
+            mem_after = rss_bytes()
+            delta = mem_after - mem_before if mem_before is not None and mem_after is not None else None
+            self.record(name, run, started, seconds, rows, delta)
+
+    def last_run(self, run: str) -> list[StageRecord]:
+        with self._lock:
+            return [r for r in self.records if r.run == run]
+
+    def to_jsonl(self) -> str:
+        with self._lock:
+            return "".join(json.dumps(asdict(r), ensure_ascii=False) + "\n" for r in self.records)
+
+    def to_prometheus(self, prefix: str = "feedback_stage") -> str:
+        with self._lock:
+            totals = {k: dict(v) for k, v in self.totals.items()}
+            last_mem = {r.stage: r.memory_delta for r in self.records if r.memory_delta is not None}
+        lines = [
+            f"# HELP {prefix}_duration_seconds Laufzeit pro Schritt",
+            f"# TYPE {prefix}_duration_seconds summary",
+        ]
+        for stage, t in sorted(totals.items()):
+            lines.append(f'{prefix}_duration_seconds_sum{{stage="{stage}"}} {t["seconds"]:.6f}')
+            lines.append(f'{prefix}_duration_seconds_count{{stage="{stage}"}} {int(t["count"])}')
+        lines += [f"# HELP {prefix}_rows_total Verarbeitete Zeilen pro Schritt",
+                  f"# TYPE {prefix}_rows_total counter"]
+        lines += [f'{prefix}_rows_total{{stage="{s}"}} {int(t["rows"])}' for s, t in sorted(totals.items())]
+        lines += [f"# HELP {prefix}_memory_delta_bytes RSS-Änderung der letzten Messung",
+                  f"# TYPE {prefix}_memory_delta_bytes gauge"]
+        lines += [f'{prefix}_memory_delta_bytes{{stage="{s}"}} {d}' for s, d in sorted(last_mem.items())]
+        return "\n".join(lines) + "\n"
+
+
+class RunProfiler:
+    """Profiliert einen Rerun mit pyinstrument (falls installiert), sonst mit cProfile."""
+
+    def __init__(self):
+        if _Pyinstrument is not None:
+            self.backend = "pyinstrument"
+            self._profiler = _Pyinstrument()
+        else:
+            import cProfile
+            self.backend = "cProfile"
+            self._profiler = cProfile.Profile()
+        self._running = False
+
+    def start(self) -> "RunProfiler":
+        if self.backend == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        self._running = True
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def stop(self, limit: int = 40) -> str:
+        """Beendet das Profiling und liefert den Bericht als Text."""
+        self._running = False
+        if self.backend == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=True, color=False)
+        import pstats
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,220 @@
+"""
+Offline-Regellernen: schlägt neue Begriffe für Zeilen vor, die nach der
+Kategorisierung als "Sonstiges" übrig bleiben.
+
+Alle Texte werden normalisiert, dedupliziert und blockweise per Regex in
+Tokens zerlegt. N-Gramme werden als Integer-Schlüssel gebildet und mit numpy
+gezählt, ohne Python-Schleife über Zeilen: zuerst nur die Abdeckung in
+"Sonstiges", danach nur für die N-Gramme mit genug Abdeckung die Treffer je
+Kategorie (dünn besetzt). Bewertet wird jedes N-Gramm danach, wie oft es in
+bereits kategorisierten Zeilen zusammen mit einer Kategorie auftritt;
+sortiert wird nach dem erwarteten Abdeckungsgewinn in "Sonstiges".
+Vorgeschlagen wird die Schreibweise aus dem Originaltext, nicht die Normalform.
+"""
+import datetime
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from matcher import FALLBACK_CATEGORY
+from normalize import dedupe_texts, normalize_text
+
+# Zeilentrenner; normalisierte Texte enthalten keine Zeilenumbrüche mehr
+_SEP = "\n"
+_TOKEN_OR_SEP = re.compile(r"\w+|\n")
+# Wortzeichen ohne "_" – entspricht den Tokens nach normalize_text im Rohtext
+_RAW_TOKEN = re.compile(r"[^\W_]+")
+
+# Häufige Funktionswörter; N-Gramme nur aus Stoppwörtern werden verworfen
+STOPWORDS = frozenset("""
+aber alle als also am an auch auf aus bei bin bis bitte da damit dann das dass dem den der des die dies
+diese doch du durch ein eine einem einen einer es für gibt hab habe hat hatte ich ihr im immer in ist
+ja jetzt kann man mehr mein meine mich mir mit nach nicht noch nur oder schon sehr sein seit sich sie
+sind so und uns von vor war was weil wenn wie wieder wir wird wo zu zum zur über
+""".split())
+
+TOKENIZE_CHUNK = 20_000
+
+LOG_COLUMNS = ["Zeitpunkt", "Kategorie", "Begriff", "Abdeckung", "Präzision", "Quelle"]
+
+
+def _tokenize(texts: list[str], chunk_size: int = TOKENIZE_CHUNK) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """
+    Token-IDs, zugehörige Zeile und Vokabular. Je Block von ``chunk_size``
+    Texten ein findall; so liegen nie alle Tokens gleichzeitig als
+    Python-Strings im Speicher, sondern nur die IDs.
+    """
+    vocab: dict[str, int] = {}
+    id_parts, row_parts = [], []
+    for offset in range(0, len(texts), chunk_size):
+        tokens = _TOKEN_OR_SEP.findall(_SEP.join(texts[offset:offset + chunk_size]) + _SEP)
+        local_ids, local_vocab = pd.factorize(np.array(tokens, dtype=object))
+        sep_id = list(local_vocab).index(_SEP)
+        is_sep = local_ids == sep_id
+        rows = offset + np.cumsum(is_sep) - is_sep  # Zeile i endet mit dem i-ten Trenner
+        to_global = np.array([-1 if t == _SEP else vocab.setdefault(t, len(vocab)) for t in local_vocab],
+                             dtype=np.int64)
+        keep = ~is_sep
+        id_parts.append(to_global[local_ids[keep]])
+        row_parts.append(rows[keep].astype(np.int64))
+    if not id_parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), []
+    return np.concatenate(id_parts), np.concatenate(row_parts), list(vocab)
+
+
+def _surface_form(raw: str, position: int, n: int, normalized: str) -> str:
+    """
+    Schreibweise des N-Gramms im Originaltext (Token ``position`` bis
+    ``position + n - 1``), damit Regeln so gespeichert werden, wie Nutzer sie
+    schreiben (Groß-/Kleinschreibung, "ß", Umlaute). Passt der Ausschnitt
+    nicht zur Normalform (z. B. weil NFKC Tokens verschoben hat), bleibt es
+    bei der Normalform.
+    """
+    spans = [m.span() for m in _RAW_TOKEN.finditer(raw)][position:position + n]
+    if len(spans) == n:
+        parts = [raw[spans[0][0]:spans[0][1]]]
+        for (_, prev_end), (begin, end) in zip(spans, spans[1:]):
+            # Wortinterne Trenner ("E-Mail") bleiben, sonst ein Leerzeichen ("Außerdem: ich")
+            gap = raw[prev_end:begin]
+            parts.append(gap if gap and not any(c.isspace() for c in gap) else " ")
+            parts.append(raw[begin:end])
+        surface = "".join(parts)
+        if normalize_text(surface) == normalized:
+            return surface
+    return normalized
+
+
+def _ngrams(ids: np.ndarray, rows: np.ndarray, max_n: int):
+    """
+    Liefert je N (1..max_n) die N-Gramm-IDs, Zeilen und Start-Token-Positionen.
+    Längere N-Gramme werden schrittweise aus (N-1)-Gramm-ID und Folgetoken
+    gebildet und neu faktorisiert, damit die Schlüssel nicht überlaufen.
+    """
+    vocab_size = int(ids.max()) + 1 if len(ids) else 1
+    gram = ids
+    for n in range(1, max_n + 1):
+        if n > 1:
+            if len(ids) < n:
+                break
+            key = gram[:-1] * vocab_size + ids[n - 1:]
+            # (N-1)-Gramm und Folgetoken müssen aus derselben Zeile stammen
+            same_row = rows[:len(key)] == rows[n - 1:]
+            gram, _ = pd.factorize(np.where(same_row, key, -1))
+            gram = np.where(same_row, gram, -1)
+        valid = gram >= 0
+        yield n, gram, valid
+
+
+def mine_candidates(feedback: pd.Series, labels: pd.Series, rules: dict[str, list[str]],
+                    max_n: int = 3, min_support: int = 5, min_labeled: int = 3,
+                    min_precision: float = 0.5, top_k: int = 100) -> pd.DataFrame:
+    """
+    Schlägt Begriffe für "Sonstiges"-Zeilen vor.
+
+    - ``min_support``: Mindestanzahl "Sonstiges"-Zeilen mit dem N-Gramm
+    - ``min_labeled``: Mindestanzahl kategorisierter Zeilen mit dem N-Gramm
+    - ``min_precision``: Mindestanteil der vorgeschlagenen Kategorie daran
+    """
+    columns = ["Begriff", "Kategorie", "Abdeckung", "Präzision", "Erwarteter Gewinn", "Belege"]
+    codes, uniques = dedupe_texts(feedback.astype(str), normalize=True)
+    if not len(uniques):
+        return pd.DataFrame(columns=columns)
+
+    # Gewicht = Anzahl Zeilen je eindeutigem Text; Kategorie der ersten Zeile
+    weights = np.bincount(codes, minlength=len(uniques))
+    first_row = np.full(len(uniques), -1, dtype=np.int64)
+    first_row[codes[::-1]] = np.arange(len(codes))[::-1]
+    categories = [cat for cat in rules if cat != FALLBACK_CATEGORY]
+    cat_index = {cat: i for i, cat in enumerate(categories)}
+    other = len(categories)
+    text_cat = labels.map(cat_index).fillna(other).to_numpy(dtype=np.int64)[first_row]
+
+    ids, rows, vocab = _tokenize(uniques)
+    if not len(ids) or not categories:
+        return pd.DataFrame(columns=columns)
+    vocab_arr = np.asarray(vocab, dtype=object)
+    row_start = np.searchsorted(rows, np.arange(len(uniques)))
+    raw_texts = feedback.astype(str).to_numpy()
+    existing = {normalize_text(t) for terms in rules.values() for t in terms}
+    n_groups = other + 1
+    frames = []
+    for n, gram, valid in _ngrams(ids, rows, max_n):
+        g_rows = rows[:len(gram)][valid]
+        g_ids = gram[valid]
+        starts = np.flatnonzero(valid)
+        if not len(g_ids):
+            continue
+        n_grams = int(g_ids.max()) + 1
+        # Dokumenthäufigkeit: jedes N-Gramm pro Text nur einmal zählen
+        pair = np.unique(g_rows * n_grams + g_ids, return_index=True)[1]
+        d_rows, d_ids, d_start = g_rows[pair], g_ids[pair], starts[pair]
+        d_cat, d_weight = text_cat[d_rows], weights[d_rows]
+
+        # Erst die Abdeckung in "Sonstiges" zählen; nur N-Gramme mit genug Abdeckung
+        # werden danach je Kategorie gezählt (dünn, statt N-Gramme x Kategorien)
+        is_other = d_cat == other
+        support_all = np.bincount(d_ids[is_other], weights=d_weight[is_other], minlength=n_grams)
+        cand = np.flatnonzero(support_all >= min_support)
+        if not len(cand):
+            continue
+        labeled_mask = ~is_other & (support_all[d_ids] >= min_support)
+        keys, inv = np.unique(d_ids[labeled_mask] * n_groups + d_cat[labeled_mask], return_inverse=True)
+        pair_counts = np.bincount(inv, weights=d_weight[labeled_mask], minlength=len(keys))
+        slot = np.searchsorted(cand, keys // n_groups)
+        labeled_total = np.bincount(slot, weights=pair_counts, minlength=len(cand))
+        best = np.zeros(len(cand), dtype=np.int64)
+        best_count = np.zeros(len(cand))
+        if len(keys):
+            # Je N-Gramm die Kategorie mit den meisten Belegen (bei Gleichstand die erste)
+            order = np.lexsort((-pair_counts, slot))
+            head = order[np.r_[True, slot[order][1:] != slot[order][:-1]]]
+            best[slot[head]] = keys[head] % n_groups
+            best_count[slot[head]] = pair_counts[head]
+        support = support_all[cand]
+        precision = np.divide(best_count, labeled_total, out=np.zeros(len(cand)), where=labeled_total > 0)
+        keep = (labeled_total >= min_labeled) & (precision >= min_precision)
+        if not keep.any():
+            continue
+        # Erste Fundstelle je N-Gramm: daraus Normalform und Schreibweise im Originaltext
+        first = np.full(n_grams, -1, dtype=np.int64)
+        first[d_ids[::-1]] = d_start[::-1]
+        sel = np.flatnonzero(keep)
+        start = first[cand[sel]]
+        tokens = np.stack([vocab_arr[ids[start + k]] for k in range(n)], axis=1)
+        normalized = [" ".join(t) for t in tokens]
+        text_rows = rows[start]
+        frames.append(pd.DataFrame({
+            "Begriff": [_surface_form(raw_texts[first_row[r]], p, n, norm)
+                        for r, p, norm in zip(text_rows, start - row_start[text_rows], normalized)],
+            "Kategorie": np.asarray(categories, dtype=object)[best[sel]],
+            "Abdeckung": support[sel].astype(np.int64),
+            "Präzision": precision[sel].round(3),
+            "Erwarteter Gewinn": (support[sel] * precision[sel]).round(1),
+            "Belege": best_count[sel].astype(np.int64),
+            "_norm": normalized,
+            "_stop": [all(t in STOPWORDS or t.isdigit() or len(t) < 3 for t in row) for row in tokens],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    out = pd.concat(frames, ignore_index=True)
+    out = out[~out["_stop"] & ~out["_norm"].isin(existing)]
+    return (out.sort_values(["Erwarteter Gewinn", "Präzision"], ascending=False)
+               .head(top_k)[columns].reset_index(drop=True))
+
+
+def log_accepted(accepted: pd.DataFrame, path: Path, source: str = "Regeln lernen") -> None:
+    """Hängt übernommene Vorschläge an das Regel-Log (CSV) an."""
+    if accepted.empty:
+        return
+    entries = pd.DataFrame({
+        "Zeitpunkt": datetime.datetime.now().isoformat(timespec="seconds"),
+        "Kategorie": accepted["Kategorie"].to_numpy(),
+        "Begriff": accepted["Begriff"].to_numpy(),
+        "Abdeckung": accepted["Abdeckung"].to_numpy(),
+        "Präzision": accepted["Präzision"].to_numpy(),
+        "Quelle": source,
+    }, columns=LOG_COLUMNS)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entries.to_csv(path, mode="a", header=not path.exists(), index=False)
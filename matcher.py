@@ -0,0 +1,436 @@
+"""
+Single-Pass-Matcher für die Feedback-Kategorisierung.
+
+Statt pro Kategorie eine große Alternations-Regex über alle Zeilen laufen zu
+lassen, werden sämtliche Begriffe aus den Regeln einmalig in einen
+gemeinsamen Präfixbaum (Trie) kompiliert. Jeder Text wird genau einmal
+durchlaufen.
+
+Die bisherigen Patterns haben die Form ``\\b(?:...)\\b``: Ein Treffer
+beginnt und endet also immer an einer Wortgrenze. Text und Begriffe werden
+deshalb in maximale Wort- bzw. Trennzeichen-Läufe (``\\w+|\\W+``) zerlegt
+und der Trie läuft über diese Tokens statt über einzelne Zeichen. Das ist
+äquivalent zu den Wortgrenzen-Prüfungen der Regex, spart aber die
+Failure-Links eines Aho-Corasick-Automaten und die meisten Dict-Zugriffe.
+
+Dieses Modul importiert bewusst kein Streamlit, damit es auch in Skripten
+(z. B. Benchmarks) verwendet werden kann.
+"""
+import copy
+import re
+import threading
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+FALLBACK_CATEGORY = "Sonstiges"
+
+# Maximale Läufe von Wortzeichen bzw. Nicht-Wortzeichen (wie \b in re)
+_TOKEN = re.compile(r"\w+|\W+")
+
+# Schlüssel für Endknoten im Trie (kann nie ein Token sein)
+_END = None
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+# Zeichen, die re.IGNORECASE zusätzlich zur Kleinschreibung gleichsetzt (einfache
+# Kleinbuchstaben-Abbildung für 'İ' sowie die Sonderfälle aus re._casefix), jeweils
+# auf das erste Zeichen der Gruppe abgebildet. Das kombinierende U+0345 fehlt bewusst:
+# es ist kein Wortzeichen und darf die Token-Grenzen nicht verschieben
+_CASE_GROUPS = ["iıİ", "sſ", "µμ", "\u03b9\u1fbe", "\u0390\u1fd3", "\u03b0\u1fe3", "βϐ", "εϵ", "θϑ",
+                "κϰ", "πϖ", "ρϱ", "σς", "φϕ", "вᲀ", "дᲁ", "оᲂ", "сᲃ", "тᲄᲅ", "ъᲆ", "ѣᲇ", "ꙋᲈ", "ṡẛ", "ﬅﬆ"]
+_CASE_FIXES = str.maketrans({c: group[0] for group in _CASE_GROUPS for c in group[1:]})
+# Vorab-Prüfung: translate() ist deutlich langsamer als eine Suche, und die Zeichen sind selten
+_CASE_FIX_RE = re.compile("[%s]" % "".join(sorted({c for group in _CASE_GROUPS for c in group[1:]})))
+
+
+def fold_text(text: str) -> str:
+    """
+    Kleinschreibung mit gleichbleibender Länge, damit Positionen im
+    gefalteten Text denen im Original entsprechen ('İ'.lower() hätte 2
+    Zeichen). Nicht-ASCII-Zeichen, die re.IGNORECASE als gleich behandelt
+    (z. B. 'ı'/'i', 'ſ'/'s'), werden auf ein Zeichen vereinheitlicht.
+    """
+    low = text.lower()
+    if len(low) != len(text):
+        low = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+    if low.isascii() or not _CASE_FIX_RE.search(low):
+        return low
+    return low.translate(_CASE_FIXES)
+
+
+def _fold_rules(rules: dict[str, list[str]]) -> dict[str, list[str]]:
+    """Gefaltete Begriffe pro (nicht leerer) Kategorie, Reihenfolge bleibt, ohne Duplikate."""
+    return {cat: list(dict.fromkeys(fold_text(t) for t in terms)) for cat, terms in rules.items() if terms}
+
+
+class RuleMatcher:
+    """
+    Kompiliert alle Regeln in einen gemeinsamen Token-Trie.
+
+    Die Reihenfolge der Kategorien im Regel-Dict bestimmt die Priorität:
+    ``categorize`` liefert – wie bisher ``categorize_series`` – die erste
+    Kategorie, deren Begriffe im Text vorkommen.
+    """
+
+    def __init__(self, rules: dict[str, list[str]]):
+        # Gefaltete, eindeutige Begriffe pro Kategorie (Basis für inkrementelle Updates)
+        self._cat_terms = _fold_rules(rules)
+        self.categories: list[str] = list(self._cat_terms)
+        # Eindeutige (gefaltete) Begriffe und die Kategorien, in denen sie vorkommen
+        self.terms: list[str] = []
+        self._term_cats: list[list[int]] = []
+        self._term_ids: dict[str, int] = {}
+        self._root: dict = {}
+        # Bei with_rules(): Knoten, die bereits kopiert wurden (None = alles frisch)
+        self._fresh: set[int] | None = None
+        # Begriffe, die mit einem Trennzeichen beginnen, starten nach einem Wort-Token
+        self._has_sep_start = False
+        # Versionszähler (gesamt und je Kategorie) für nachgelagerte Caches
+        self.version = 0
+        self.category_versions: dict[str, int] = dict.fromkeys(self.categories, 0)
+        for idx, cat in enumerate(self.categories):
+            for term in self._cat_terms[cat]:
+                self._add_term(term, idx)
+        self._empty_term_cat = self._find_empty_term()
+
+    def _find_empty_term(self) -> int | None:
+        """Leerer Begriff: \\b\\b trifft jeden Text mit mindestens einem Wortzeichen."""
+        for idx, cat in enumerate(self.categories):
+            if "" in self._cat_terms[cat]:
+                return idx
+        return None
+
+    def _walk(self, term: str, create: bool) -> dict | None:
+        """Knoten des Begriffs; kopiert bei with_rules() den Pfad (copy-on-write)."""
+        node = self._root
+        for tok in _TOKEN.findall(term):
+            child = node.get(tok)
+            if child is None:
+                if not create:
+                    return None
+                child = node[tok] = {}
+            elif self._fresh is not None and id(child) not in self._fresh:
+                child = node[tok] = dict(child)
+            else:
+                node = child
+                continue
+            if self._fresh is not None:
+                self._fresh.add(id(child))
+            node = child
+        return node
+
+    def _add_term(self, term: str, cat_idx: int) -> None:
+        if not term:
+            return
+        if not _is_word_char(term[0]):
+            self._has_sep_start = True
+        node = self._walk(term, create=True)
+        # Endknoten: (kleinster Kategorie-Index, braucht folgendes Wort-Token?, Begriff-ID)
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self.terms)
+            self.terms.append(term)
+            self._term_cats.append([])
+        cats = self._term_cats[term_id]
+        if cat_idx not in cats:
+            cats = self._term_cats[term_id] = [*cats, cat_idx]
+        node[_END] = (min(cats), not _is_word_char(term[-1]), term_id)
+
+    def _remove_term(self, term: str, cat_idx: int) -> None:
+        term_id = self._term_ids.get(term)
+        if term_id is None or cat_idx not in self._term_cats[term_id]:
+            return
+        cats = self._term_cats[term_id] = [c for c in self._term_cats[term_id] if c != cat_idx]
+        node = self._walk(term, create=False)
+        if cats:
+            node[_END] = (min(cats), node[_END][1], term_id)
+        else:
+            # Begriff-ID bleibt reserviert, damit bestehende Treffer-Arrays gültig bleiben
+            del node[_END]
+
+    def with_rules(self, rules: dict[str, list[str]]) -> "RuleMatcher":
+        """
+        Liefert einen Matcher für geänderte Regeln. Nur die Begriffe geänderter
+        Kategorien werden aus- bzw. eingetragen; unveränderte Teile des Tries
+        werden geteilt, kopiert wird nur entlang geänderter Pfade. Der alte
+        Matcher bleibt unverändert nutzbar (z. B. für laufende Reruns).
+        Werden Kategorien entfernt oder umsortiert, verschieben sich die
+        Prioritäten – dann wird komplett neu kompiliert.
+        """
+        new_terms = _fold_rules(rules)
+        order = list(new_terms)
+        changed = [cat for cat in order if set(new_terms[cat]) != set(self._cat_terms.get(cat, ()))]
+        if order[:len(self.categories)] != self.categories:
+            matcher = RuleMatcher(rules)
+            matcher.version = self.version + 1
+            matcher.category_versions = dict.fromkeys(matcher.categories, matcher.version)
+            return matcher
+        if not changed:
+            return self
+
+        matcher = copy.copy(self)
+        matcher._root = dict(self._root)
+        matcher._fresh = {id(matcher._root)}
+        matcher.terms = list(self.terms)
+        matcher._term_cats = list(self._term_cats)
+        matcher._term_ids = dict(self._term_ids)
+        matcher.categories = order
+        for cat in changed:
+            idx = order.index(cat)
+            old, new = set(self._cat_terms.get(cat, ())), set(new_terms[cat])
+            for term in old - new:
+                matcher._remove_term(term, idx)
+            for term in new_terms[cat]:
+                if term not in old:
+                    matcher._add_term(term, idx)
+        matcher._fresh = None
+        matcher._cat_terms = new_terms
+        matcher._empty_term_cat = matcher._find_empty_term()
+        matcher.version = self.version + 1
+        matcher.category_versions = {**self.category_versions, **dict.fromkeys(changed, matcher.version)}
+        return matcher
+
+    def rule_terms(self) -> list[tuple[int, str, int]]:
+        """(Kategorie-Index, gefalteter Begriff, Begriff-ID) in Regel-Reihenfolge."""
+        return [
+            (idx, term, self._term_ids[term])
+            for idx, cat in enumerate(self.categories)
+            for term in self._cat_terms[cat] if term
+        ]
+
+    def _start_positions(self, tokens: list[str]) -> range:
+        """Token-Indizes, an denen \\b vor einem Begriff gelten kann."""
+        first = 0 if _is_word_char(tokens[0][0]) else 1
+        if self._has_sep_start:
+            # Trennzeichen-Token nach einem Wort-Token kommen ebenfalls in Frage
+            return range(first, len(tokens))
+        return range(first, len(tokens), 2)
+
+    def match_index(self, text: str) -> int:
+        """Index der ersten passenden Kategorie oder -1."""
+        if not isinstance(text, str):
+            return -1
+        tokens = _TOKEN.findall(fold_text(text))
+        best = len(self.categories)
+        if self._empty_term_cat is not None and any(_is_word_char(t[0]) for t in tokens):
+            best = self._empty_term_cat
+        root = self._root
+        if not tokens or root.keys().isdisjoint(tokens):
+            return best if best < len(self.categories) else -1
+        n = len(tokens)
+        for i in self._start_positions(tokens):
+            node = root.get(tokens[i])
+            j = i
+            while node is not None:
+                j += 1
+                end = node.get(_END)
+                # Endet der Begriff mit einem Trennzeichen, muss ein Wort folgen
+                if end is not None and end[0] < best and (not end[1] or j < n):
+                    best = end[0]
+                    if best == 0:
+                        return 0
+                if j >= n:
+                    break
+                node = node.get(tokens[j])
+        return best if best < len(self.categories) else -1
+
+    def categorize(self, texts: Iterable) -> list[str]:
+        """Liefert für jeden Text die erste passende Kategorie bzw. 'Sonstiges'."""
+        cats = self.categories
+        out = []
+        for text in texts:
+            idx = self.match_index(text)
+            out.append(cats[idx] if idx >= 0 else FALLBACK_CATEGORY)
+        return out
+
+    def score(self, texts: Iterable) -> "MatchScores":
+        """
+        Sammelt in einem Durchlauf alle Treffer pro Text (Multi-Label-Modus).
+        Ergebnis sind kompakte CSR-Arrays statt Listen von Dicts.
+        """
+        indptr = array("q", [0])
+        term_ids = array("i")
+        starts = array("i")
+        ends = array("i")
+        root = self._root
+        for text in texts:
+            tokens = _TOKEN.findall(fold_text(text)) if isinstance(text, str) else []
+            if tokens and not root.keys().isdisjoint(tokens):
+                n = len(tokens)
+                offsets = None
+                for i in self._start_positions(tokens):
+                    node = root.get(tokens[i])
+                    j = i
+                    while node is not None:
+                        j += 1
+                        end = node.get(_END)
+                        if end is not None and (not end[1] or j < n):
+                            if offsets is None:
+                                offsets = [0, *accumulate(map(len, tokens))]
+                            term_ids.append(end[2])
+                            starts.append(offsets[i])
+                            ends.append(offsets[j])
+                        if j >= n:
+                            break
+                        node = node.get(tokens[j])
+            indptr.append(len(term_ids))
+        return MatchScores.from_hits(
+            self.categories, self.terms, self._term_cats,
+            np.frombuffer(indptr, dtype=np.int64),
+            np.frombuffer(term_ids, dtype=np.int32),
+            np.frombuffer(starts, dtype=np.int32),
+            np.frombuffer(ends, dtype=np.int32),
+        )
+
+
+
+class RulesIndex:
+    """
+    Hält den aktuellen Matcher und patcht ihn bei Regeländerungen nur für
+    die geänderten Kategorien (siehe ``RuleMatcher.with_rules``).
+    """
+
+    def __init__(self):
+        self._rules: dict[str, list[str]] | None = None
+        self._matcher: RuleMatcher | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._matcher.version if self._matcher else 0
+
+    def get(self, rules: dict[str, list[str]]) -> RuleMatcher:
+        with self._lock:
+            if self._matcher is None:
+                self._matcher = RuleMatcher(rules)
+            elif rules != self._rules:
+                self._matcher = self._matcher.with_rules(rules)
+            self._rules = copy.deepcopy(rules)
+            return self._matcher
+
+
+@dataclass
+class MatchScores:
+    """
+    Multi-Label-Ergebnis im CSR-Format.
+
+    Treffer von Zeile ``i`` liegen in ``term_ids[indptr[i]:indptr[i+1]]``
+    (Zeichen-Spans in ``span_start``/``span_end``), die Trefferzahlen pro
+    Kategorie in ``cat_ids``/``cat_counts[cat_indptr[i]:cat_indptr[i+1]]``.
+    ``primary`` ist die Kategorie mit den meisten Treffern (bei Gleichstand
+    gewinnt die Regel-Reihenfolge), ``confidence`` deren Anteil an allen
+    Kategorie-Treffern der Zeile. Zeilen ohne Treffer haben ``primary == -1``.
+    """
+    categories: list[str]
+    terms: list[str]
+    indptr: np.ndarray
+    term_ids: np.ndarray
+    span_start: np.ndarray
+    span_end: np.ndarray
+    cat_indptr: np.ndarray
+    cat_ids: np.ndarray
+    cat_counts: np.ndarray
+    primary: np.ndarray
+    confidence: np.ndarray
+
+    @classmethod
+    def from_hits(cls, categories, terms, term_cats, indptr, term_ids, span_start, span_end) -> "MatchScores":
+        n_rows = len(indptr) - 1
+        n_cats = max(len(categories), 1)
+        # Begriff -> Kategorien ebenfalls als CSR, damit die Expansion vektorisiert bleibt
+        tc_len = np.array([len(c) for c in term_cats], dtype=np.int64)
+        tc_indptr = np.concatenate(([0], np.cumsum(tc_len)))
+        tc_ids = np.array([c for cs in term_cats for c in cs], dtype=np.int64)
+
+        hit_rows = np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(indptr))
+        per_hit = tc_len[term_ids] if len(term_ids) else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(hit_rows, per_hit)
+        # Position jedes expandierten Eintrags innerhalb seiner Begriff-Kategorienliste
+        within = np.arange(len(rows)) - np.repeat(np.cumsum(per_hit) - per_hit, per_hit)
+        cats = tc_ids[np.repeat(tc_indptr[term_ids], per_hit) + within] if len(rows) else rows
+
+        keys, counts = np.unique(rows * n_cats + cats, return_counts=True)
+        key_rows = keys // n_cats
+        cat_ids = (keys % n_cats).astype(np.int16 if n_cats < 2**15 else np.int32)
+        cat_indptr = np.concatenate(([0], np.cumsum(np.bincount(key_rows, minlength=n_rows))))
+
+        primary = np.full(n_rows, -1, dtype=np.int32)
+        confidence = np.zeros(n_rows, dtype=np.float32)
+        if len(keys):
+            # Pro Zeile: meiste Treffer zuerst, bei Gleichstand kleinster Kategorie-Index
+            order = np.lexsort((cat_ids, -counts, key_rows))
+            first = order[np.concatenate(([True], np.diff(key_rows[order]) != 0))]
+            totals = np.bincount(key_rows, weights=counts, minlength=n_rows)
+            primary[key_rows[first]] = cat_ids[first]
+            confidence[key_rows[first]] = counts[first] / totals[key_rows[first]]
+        return cls(
+            categories=list(categories), terms=list(terms),
+            indptr=indptr, term_ids=term_ids, span_start=span_start, span_end=span_end,
+            cat_indptr=cat_indptr, cat_ids=cat_ids, cat_counts=counts.astype(np.int32),
+            primary=primary, confidence=confidence,
+        )
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def primary_labels(self) -> pd.Categorical:
+        """Hauptkategorie pro Zeile ('Sonstiges' ohne Treffer)."""
+        labels = [*self.categories, FALLBACK_CATEGORY]
+        return pd.Categorical.from_codes(np.where(self.primary >= 0, self.primary, len(self.categories)), labels)
+
+    def secondary_labels(self, sep: str = ", ") -> pd.Categorical:
+        """Weitere getroffene Kategorien pro Zeile (ohne die Hauptkategorie)."""
+        combos: dict[tuple, str] = {}
+        codes = np.empty(len(self), dtype=np.int64)
+        cats = self.categories
+        ptr, ids, primary = self.cat_indptr, self.cat_ids, self.primary
+        for i in range(len(self)):
+            key = tuple(int(c) for c in ids[ptr[i]:ptr[i + 1]] if c != primary[i])
+            code = combos.get(key)
+            if code is None:
+                code = combos[key] = len(combos)
+            codes[i] = code
+        labels = [sep.join(cats[c] for c in key) for key in combos]
+        return pd.Categorical.from_codes(codes, pd.Index(labels, dtype=object))
+
+    def matched_terms(self, row: int) -> list[tuple[str, int, int]]:
+        """(Begriff, Start, Ende) aller Treffer einer Zeile."""
+        lo, hi = self.indptr[row], self.indptr[row + 1]
+        return [
+            (self.terms[t], int(s), int(e))
+            for t, s, e in zip(self.term_ids[lo:hi], self.span_start[lo:hi], self.span_end[lo:hi])
+        ]
+
+
+# --- Referenzimplementierung (bisheriger Regex-Pfad) ---
+def compile_regex_patterns(rules: dict[str, list[str]]) -> dict[str, re.Pattern]:
+    """Eine Alternations-Regex pro Kategorie (alter Pfad, u. a. für Benchmarks)."""
+    patterns: dict[str, re.Pattern] = {}
+    for cat, terms in rules.items():
+        if terms:
+            escaped = [re.escape(t) for t in terms]
+            try:
+                patterns[cat] = re.compile(r"\b(?:%s)\b" % "|".join(escaped), re.IGNORECASE)
+            except re.error:
+                # Fallback: wenn etwas schiefgeht, nimm einfache contains-Variante
+                patterns[cat] = re.compile("|".join(escaped), re.IGNORECASE)
+    return patterns
+
+
+def categorize_regex(feedback: pd.Series, patterns: dict[str, re.Pattern]) -> pd.Series:
+    """Ein str.contains-Durchlauf pro Kategorie (alter Pfad)."""
+    # object-dtype erzwingt Python-re; pyarrow-Strings nutzen RE2 mit ASCII-\b
+    df = pd.DataFrame({'Feedback': feedback.astype(object)})
+    df['Kategorie'] = FALLBACK_CATEGORY
+    for cat, pat in patterns.items():
+        mask = df['Feedback'].str.contains(pat, regex=True, na=False)
+        df.loc[mask & (df['Kategorie'] == FALLBACK_CATEGORY), 'Kategorie'] = cat
+    return df['Kategorie']
@@ -0,0 +1,55 @@
+"""
+Normalisierung und Deduplizierung der Feedback-Texte vor dem Matching.
+
+Exporte enthalten viele Texte, die sich nur in Groß-/Kleinschreibung,
+Leerraum, Satzzeichen oder der Umlaut-Schreibweise ("ue" statt "ü")
+unterscheiden. Die Texte werden deshalb normalisiert, auf eindeutige Werte
+reduziert, nur diese gematcht und die Kategorien anschließend per
+Index-Array auf alle Zeilen zurückverteilt. Die Begriffe der Regeln werden
+mit derselben Funktion normalisiert, damit beide Seiten zusammenpassen.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+_UMLAUTS = {"ae": "ä", "oe": "ö", "ue": "ü"}
+_UMLAUT_RE = re.compile("|".join(_UMLAUTS))
+# Satzzeichen/Symbole (alles außer Wortzeichen und Leerraum) sowie "_"
+_PUNCT_RE = re.compile(r"[^\w\s]|_")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC, casefold, Umlaut-Varianten, Satzzeichen entfernen, Leerraum zusammenfassen."""
+    if not isinstance(text, str):
+        return ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    text = text.casefold()
+    text = _UMLAUT_RE.sub(lambda m: _UMLAUTS[m.group()], text)
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def normalize_rules(rules: dict[str, list[str]]) -> dict[str, list[str]]:
+    """Normalisiert alle Begriffe (Reihenfolge bleibt, Duplikate fallen weg)."""
+    out: dict[str, list[str]] = {}
+    for cat, terms in rules.items():
+        normed = (normalize_text(t) for t in terms)
+        out[cat] = list(dict.fromkeys(t for t in normed if t))
+    return out
+
+
+def dedupe_texts(feedback: pd.Series, normalize: bool = True) -> tuple[np.ndarray, list[str]]:
+    """
+    Zerlegt die Spalte in eindeutige Texte plus Index-Array, sodass
+    ``uniques[codes[i]]`` zu Zeile ``i`` gehört. Normalisiert wird erst nach
+    der exakten Deduplizierung, also nur einmal pro Rohtext.
+    """
+    codes, raw_uniques = pd.factorize(feedback, use_na_sentinel=False)
+    if not normalize:
+        return codes, list(raw_uniques)
+    norm_codes, uniques = pd.factorize(np.array([normalize_text(t) for t in raw_uniques], dtype=object))
+    return norm_codes[codes], list(uniques)
@@ -0,0 +1,140 @@
+"""
+Parallele Kategorisierung über einen Prozess-Pool.
+
+Der Pool hängt nicht von den Regeln ab: Jede Aufgabe trägt die
+Regel-Version mit, und jeder Worker hält die Matcher der zuletzt genutzten
+Versionen vor, statt bei jeder Regeländerung den Pool neu zu starten. Eine
+neue Version wird aus dem zuletzt genutzten Matcher per ``with_rules``
+abgeleitet, sodass nur geänderte Kategorien neu eingetragen werden. So
+können sich Sitzungen mit unterschiedlichen Regeln bzw. Normalisierung einen
+Pool teilen. Kleine Eingaben laufen ohne Pool im eigenen Prozess.
+"""
+import multiprocessing as mp
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from matcher import FALLBACK_CATEGORY, RuleMatcher
+from result_cache import rules_hash
+
+# Unterhalb dieser Zeilenzahl lohnt sich der Pool-Overhead nicht
+MIN_PARALLEL_ROWS = 20_000
+# Matcher-Versionen, die ein Worker gleichzeitig vorhält
+WORKER_MATCHERS = 4
+
+# Matcher des Worker-Prozesses je Regel-Version (zuletzt genutzte am Ende)
+_worker_matchers: "OrderedDict[str, RuleMatcher]" = OrderedDict()
+
+
+def _worker_matcher(version: str, rules: dict[str, list[str]]) -> RuleMatcher:
+    matcher = _worker_matchers.get(version)
+    if matcher is None:
+        latest = next(reversed(_worker_matchers.values()), None)
+        # Aus dem zuletzt genutzten Stand ableiten: unveränderte Kategorien werden geteilt
+        matcher = latest.with_rules(rules) if latest is not None else RuleMatcher(rules)
+        _worker_matchers[version] = matcher
+        while len(_worker_matchers) > WORKER_MATCHERS:
+            _worker_matchers.popitem(last=False)
+    _worker_matchers.move_to_end(version)
+    return matcher
+
+
+def _match_shard(task: tuple[str, dict[str, list[str]], list]) -> list[int]:
+    version, rules, texts = task
+    match = _worker_matcher(version, rules).match_index
+    return [match(t) for t in texts]
+
+
+class WorkerPool:
+    """Prozess-Pool, unabhängig von den Regeln; wird beim ersten Bedarf gestartet."""
+
+    def __init__(self, workers: int | None = None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._pool: ProcessPoolExecutor | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker-Pool wurde bereits geschlossen")
+            if self._pool is None:
+                # fork, wo verfügbar: bei spawn würde der Kindprozess das Streamlit-Skript
+                # (sys.modules['__main__']) erneut ausführen
+                method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context(method))
+            return self._pool
+
+    def map(self, version: str, rules: dict[str, list[str]], shards: list[list]) -> Iterable[list[int]]:
+        return self._get_pool().map(_match_shard, [(version, rules, shard) for shard in shards])
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+class ParallelCategorizer:
+    """
+    Verteilt die Kategorisierung auf ``workers`` Prozesse und setzt die
+    Ergebnisse in der ursprünglichen Reihenfolge wieder zusammen. Mit
+    ``pool`` wird ein geteilter Pool genutzt (und von ``close`` nicht beendet),
+    sonst ein eigener.
+    """
+
+    def __init__(self, rules: dict[str, list[str]], workers: int | None = None,
+                 min_rows: int = MIN_PARALLEL_ROWS, matcher: RuleMatcher | None = None,
+                 pool: WorkerPool | None = None, version: str | None = None):
+        self.rules = rules
+        self.version = version or rules_hash(rules)
+        self.pool = pool or WorkerPool(workers)
+        self._owns_pool = pool is None
+        self.workers = self.pool.workers
+        self.min_rows = min_rows
+        self.matcher = matcher or RuleMatcher(rules)
+
+    def categorize(self, texts: Iterable) -> list[str]:
+        """Wie ``RuleMatcher.categorize``, bei großen Eingaben parallel."""
+        texts = list(texts)
+        if self.workers <= 1 or len(texts) < self.min_rows:
+            return self.matcher.categorize(texts)
+        # Zusammenhängende Shards, damit die Reihenfolge beim Zusammensetzen stimmt
+        step = -(-len(texts) // self.workers)
+        shards = [texts[i:i + step] for i in range(0, len(texts), step)]
+        cats = self.matcher.categories
+        out: list[str] = []
+        for indices in self.pool.map(self.version, self.rules, shards):
+            out.extend(cats[i] if i >= 0 else FALLBACK_CATEGORY for i in indices)
+        return out
+
+    def close(self) -> None:
+        if self._owns_pool:
+            self.pool.close()
+
+
+# Ein Pool pro Worker-Zahl und Prozess, von allen Sitzungen und Regel-Versionen geteilt
+_shared_pools: dict[int, WorkerPool] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_pool(workers: int | None = None) -> WorkerPool:
+    workers = max(1, workers or os.cpu_count() or 1)
+    with _shared_lock:
+        pool = _shared_pools.get(workers)
+        if pool is None or pool.closed:
+            pool = _shared_pools[workers] = WorkerPool(workers)
+        return pool
+
+
+def shared_categorizer(rules: dict[str, list[str]], workers: int | None = None,
+                       matcher: RuleMatcher | None = None, version: str | None = None) -> ParallelCategorizer:
+    """Categorizer auf dem geteilten Pool; der Pool überlebt Reruns und Regeländerungen."""
+    return ParallelCategorizer(rules, matcher=matcher, pool=shared_pool(workers), version=version)
@@ -0,0 +1,125 @@
+"""
+Persistenter, größenbeschränkter Ergebnis-Cache (SQLite) für Kategorisierungen.
+
+Schlüssel ist (Regel-Version, Hash des normalisierten Textes). Die
+Regel-Version ist ein Hash über die Regeln; geänderte Regeln ergeben damit
+automatisch eine neue Version, alte Einträge werden nicht gelöscht, sondern
+laufen per LRU-Verdrängung aus.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from matcher import fold_text
+
+DEFAULT_MAX_ENTRIES = 500_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    rules_version TEXT NOT NULL,
+    text_hash     BLOB NOT NULL,
+    category      TEXT NOT NULL,
+    last_used     INTEGER NOT NULL,
+    PRIMARY KEY (rules_version, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def rules_hash(rules: dict[str, list[str]]) -> str:
+    """Version der Regeln; die Reihenfolge zählt mit (sie bestimmt die Priorität)."""
+    raw = json.dumps(rules, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def text_hash(text: str) -> bytes:
+    """Hash des normalisierten Textes (der Matcher ignoriert Groß-/Kleinschreibung)."""
+    return hashlib.blake2b(fold_text(text).encode("utf-8"), digest_size=16).digest()
+
+
+class ResultCache:
+    """
+    Bildet (Regel-Version, Text-Hash) auf die Kategorie ab. Zugriffe sind
+    threadsicher, da Streamlit-Reruns in wechselnden Threads laufen.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("CREATE TEMP TABLE lookup (text_hash BLOB PRIMARY KEY)")
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def lookup(self, version: str, hashes: Iterable[bytes]) -> dict[bytes, str]:
+        """Bekannte Kategorien für die Hashes; Treffer werden als benutzt markiert."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM lookup")
+            self._conn.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", ((h,) for h in hashes))
+            found = dict(self._conn.execute(
+                "SELECT r.text_hash, r.category FROM lookup l "
+                "JOIN results r ON r.rules_version = ? AND r.text_hash = l.text_hash",
+                (version,),
+            ))
+            self._conn.executemany(
+                "UPDATE results SET last_used = ? WHERE rules_version = ? AND text_hash = ?",
+                ((time.time_ns(), version, h) for h in found),
+            )
+        return found
+
+    def store(self, version: str, items: dict[bytes, str]) -> None:
+        """Speichert neue Ergebnisse und verdrängt bei Bedarf die ältesten Einträge."""
+        now = time.time_ns()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                ((version, h, cat, now) for h, cat in items.items()),
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM results WHERE (rules_version, text_hash) IN "
+                    "(SELECT rules_version, text_hash FROM results ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+
+    def categorize(self, texts: Iterable[str], version: str,
+                   categorize: Callable[[list[str]], list[str]]) -> list[str]:
+        """
+        Kategorisiert über den Cache: nur bisher unbekannte Texte gehen an
+        ``categorize``. Trefferquote wird pro eindeutigem Text gezählt.
+        """
+        texts = list(texts)
+        hashes = [text_hash(t) for t in texts]
+        unique = dict(zip(hashes, texts))
+        found = self.lookup(version, unique)
+        missing = [h for h in unique if h not in found]
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            new = dict(zip(missing, categorize([unique[h] for h in missing])))
+            self.store(version, new)
+            found.update(new)
+        return [found[h] for h in hashes]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
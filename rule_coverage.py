@@ -0,0 +1,148 @@
+"""
+Abdeckungs- und Konfliktanalyse der Regeln für einen Upload.
+
+Grundlage ist ein invertierter Index Begriff -> Zeilen, der aus einem einzigen
+Multi-Label-Durchlauf des Matchers (``RuleMatcher.score``) entsteht. Daraus
+werden in einem Schritt berechnet:
+
+- Treffer pro Begriff und Kategorie (gewichtet mit der Anzahl doppelter Zeilen)
+- tote Begriffe (kein einziger Treffer)
+- verdeckte Begriffe: treffen zwar, zählen aber nie für ihre Kategorie, weil
+  eine frühere Kategorie in denselben Zeilen gewinnt
+- Überschneidungsmatrix (Zeilen, die von zwei Kategorien getroffen werden) und
+  Verdeckungsmatrix (Kategorie A gewinnt Zeilen, die auch B getroffen hätte)
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from matcher import FALLBACK_CATEGORY, MatchScores, RuleMatcher
+
+STATUS_DEAD = "tot"
+STATUS_SHADOWED = "verdeckt"
+STATUS_PARTIAL = "teilweise verdeckt"
+STATUS_ACTIVE = "aktiv"
+
+
+@dataclass
+class TermIndex:
+    """
+    Invertierter Index im CSR-Format: Zeilen (eindeutige Texte) von Begriff
+    ``t`` liegen in ``rows[indptr[t]:indptr[t+1]]``, jede Zeile nur einmal.
+    ``winner`` ist die Kategorie, die die Zeile bei First-Match bekommt (-1 = keine).
+    """
+    terms: list[str]
+    indptr: np.ndarray
+    rows: np.ndarray
+    weights: np.ndarray
+    winner: np.ndarray
+    scores: MatchScores
+
+    @classmethod
+    def build(cls, scores: MatchScores, weights: np.ndarray | None = None) -> "TermIndex":
+        n_rows, n_terms = len(scores), len(scores.terms)
+        weights = np.ones(n_rows, dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        hit_rows = np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(scores.indptr))
+        # (Begriff, Zeile) eindeutig und nach Begriff sortiert = Transponierte der Treffer-CSR
+        keys = np.unique(scores.term_ids.astype(np.int64) * max(n_rows, 1) + hit_rows)
+        term_of = keys // max(n_rows, 1)
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(term_of, minlength=n_terms))))
+        # cat_ids sind pro Zeile aufsteigend: die erste ist die First-Match-Kategorie
+        has_hit = np.diff(scores.cat_indptr) > 0
+        winner = np.full(n_rows, -1, dtype=np.int64)
+        winner[has_hit] = scores.cat_ids[scores.cat_indptr[:-1][has_hit]]
+        return cls(terms=scores.terms, indptr=indptr, rows=keys % max(n_rows, 1),
+                   weights=weights, winner=winner, scores=scores)
+
+    def rows_for(self, term_id: int) -> np.ndarray:
+        """Eindeutige Zeilen, in denen der Begriff vorkommt."""
+        return self.rows[self.indptr[term_id]:self.indptr[term_id + 1]]
+
+
+@dataclass
+class CoverageReport:
+    terms: pd.DataFrame      # eine Zeile pro (Kategorie, Begriff)
+    overlap: pd.DataFrame    # Zeilen mit Treffern in beiden Kategorien (Diagonale: alle Treffer)
+    shadowing: pd.DataFrame  # Zeile A, Spalte B: A gewinnt Zeilen, in denen auch B trifft
+    categories: pd.DataFrame  # Zuordnungen pro Kategorie inkl. "Sonstiges"
+
+
+def analyze(matcher: RuleMatcher, index: TermIndex) -> CoverageReport:
+    """Berechnet alle Kennzahlen aus dem Index, ohne erneut zu matchen."""
+    cats = matcher.categories
+    n_cats = len(cats)
+    entries = matcher.rule_terms()
+    ent_cat = np.array([c for c, _, _ in entries], dtype=np.int64)
+    ent_term = np.array([t for _, _, t in entries], dtype=np.int64)
+
+    # Begriff -> Einträge (ein Begriff kann in mehreren Kategorien stehen)
+    n_terms = len(index.terms)
+    order = np.argsort(ent_term, kind="stable")
+    per_term = np.bincount(ent_term, minlength=n_terms)
+    ent_indptr = np.concatenate(([0], np.cumsum(per_term)))
+
+    # Jeden (Begriff, Zeile)-Treffer auf alle Einträge des Begriffs verteilen
+    pair_term = np.repeat(np.arange(n_terms, dtype=np.int64), np.diff(index.indptr))
+    fan = per_term[pair_term]
+    pair_rows = np.repeat(index.rows, fan)
+    within = np.arange(len(pair_rows)) - np.repeat(np.cumsum(fan) - fan, fan)
+    ent = order[np.repeat(ent_indptr[pair_term], fan) + within] if len(pair_rows) else pair_rows
+    w = index.weights[pair_rows]
+    won = index.winner[pair_rows] == ent_cat[ent]
+    hits = np.bincount(ent, weights=w, minlength=len(entries)).astype(np.int64)
+    wins = np.bincount(ent, weights=w * won, minlength=len(entries)).astype(np.int64)
+
+    term_cats: dict[int, list[str]] = {}
+    for c, _, t in entries:
+        term_cats.setdefault(t, []).append(cats[c])
+    status = np.where(hits == 0, STATUS_DEAD,
+                      np.where(wins == 0, STATUS_SHADOWED,
+                               np.where(wins < hits, STATUS_PARTIAL, STATUS_ACTIVE)))
+    terms = pd.DataFrame({
+        "Kategorie": pd.Categorical([cats[c] for c in ent_cat], categories=cats),
+        "Begriff": [t for _, t, _ in entries],
+        "Treffer": hits,
+        "Gewertet": wins,
+        "Verdeckt": hits - wins,
+        "Status": status,
+        "Auch in": [", ".join(o for o in term_cats[t] if o != cats[c]) for c, _, t in entries],
+    })
+
+    # Kategorie-Paare: nur Zeilen mit Treffern in mindestens zwei Kategorien
+    s = index.scores
+    per_row = np.diff(s.cat_indptr)
+    row_of = np.repeat(np.arange(len(s), dtype=np.int64), per_row)
+    cat_w = index.weights[row_of]
+    totals = np.bincount(s.cat_ids, weights=cat_w, minlength=n_cats)
+    overlap = np.diag(totals)
+    shadowing = np.zeros((n_cats, n_cats))
+    multi = per_row[row_of] > 1
+    if multi.any():
+        m_rows, m_cats = row_of[multi], s.cat_ids[multi].astype(np.int64)
+        uniq_rows, local = np.unique(m_rows, return_inverse=True)
+        indicator = np.zeros((len(uniq_rows), n_cats))
+        indicator[local, m_cats] = 1.0
+        weighted = indicator * index.weights[uniq_rows][:, None]
+        overlap = indicator.T @ weighted
+        np.fill_diagonal(overlap, totals)
+        winner_onehot = np.zeros_like(indicator)
+        winner_onehot[np.arange(len(uniq_rows)), index.winner[uniq_rows]] = 1.0
+        shadowing = winner_onehot.T @ weighted
+        np.fill_diagonal(shadowing, 0)
+
+    assigned = np.bincount(np.where(index.winner >= 0, index.winner, n_cats),
+                           weights=index.weights, minlength=n_cats + 1).astype(np.int64)
+    all_totals = np.append(totals, assigned[n_cats]).astype(np.int64)
+    categories = pd.DataFrame({
+        "Zeilen mit Treffer": all_totals,
+        "Zugeordnet": assigned,
+        "An frühere Kategorie verloren": all_totals - assigned,
+    }, index=pd.Index([*cats, FALLBACK_CATEGORY], name="Kategorie"))
+
+    return CoverageReport(
+        terms=terms,
+        overlap=pd.DataFrame(overlap.astype(np.int64), index=cats, columns=cats),
+        shadowing=pd.DataFrame(shadowing.astype(np.int64), index=cats, columns=cats),
+        categories=categories,
+    )
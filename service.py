@@ -0,0 +1,253 @@
+"""
+Lokaler HTTP-Dienst zur Kategorisierung in Echtzeit (asyncio, ohne Streamlit).
+
+Hält die kompilierten Regeln im Speicher und nimmt einzelne Texte oder
+JSON-Batches an:
+
+    POST /categorize  {"text": "..."}          -> {"category": "..."}
+    POST /categorize  {"texts": ["...", ...]}  -> {"categories": [...]}
+    GET  /health                               -> Status und Regel-Version
+
+Anfragen, die innerhalb weniger Millisekunden eintreffen, werden zu einem
+einzigen Matcher-Aufruf zusammengefasst. Änderungen an der Regeldatei (z. B.
+durch ``save_rules`` in der App) werden ohne Neustart übernommen.
+
+    python -m service --port 8080
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from categorizer import RULES_PATH, load_rules
+from matcher import RuleMatcher, RulesIndex
+from normalize import dedupe_texts, normalize_rules
+from result_cache import rules_hash
+
+DEFAULT_BATCH_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 2048
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RulesHolder:
+    """Aktueller Matcher samt Version; lädt neu, wenn sich die Regeldatei ändert."""
+
+    def __init__(self, path: Path = RULES_PATH, normalize: bool = True):
+        self.path = path
+        self.normalize = normalize
+        self._mtime: float | None = None
+        # Bei Änderungen werden nur die geänderten Kategorien neu eingetragen
+        self._index = RulesIndex()
+        self.reload()
+
+    def reload(self) -> None:
+        # mtime vor dem Lesen bestimmen, aber erst nach erfolgreichem Laden übernehmen:
+        # schlägt das Parsen fehl (halb geschriebene Datei), wird beim nächsten Mal erneut geladen
+        mtime = self.path.stat().st_mtime if self.path.exists() else None
+        rules = load_rules(self.path)
+        match_rules = normalize_rules(rules) if self.normalize else rules
+        # Zuweisung als Tupel, damit laufende Batches nie einen halben Stand sehen
+        self.state: tuple[RuleMatcher, str] = (self._index.get(match_rules), rules_hash(match_rules))
+        self._mtime = mtime
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.reload()
+        return True
+
+    def categorize(self, texts: list[str]) -> list[str]:
+        matcher, _ = self.state
+        codes, uniques = dedupe_texts(pd.Series(texts, dtype=object), self.normalize)
+        return np.asarray(matcher.categorize(uniques), dtype=object)[codes].tolist()
+
+
+class MicroBatcher:
+    """Sammelt Anfragen für ``window`` Sekunden (bzw. bis ``max_batch`` Texte) und matcht gemeinsam."""
+
+    def __init__(self, holder: RulesHolder, window: float, max_batch: int):
+        self.holder = holder
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self._queue: asyncio.Queue[tuple[list[str], asyncio.Future]] = asyncio.Queue()
+
+    async def submit(self, texts: list[str]) -> list[str]:
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, fut))
+        return await fut
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.window
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            texts = [t for batch, _ in pending for t in batch]
+            try:
+                # Im Thread, damit neue Anfragen schon für den nächsten Batch gesammelt werden
+                labels = await loop.run_in_executor(None, self.holder.categorize, texts)
+            except Exception as e:
+                for _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.batches += 1
+            pos = 0
+            for batch, fut in pending:
+                if not fut.done():
+                    fut.set_result(labels[pos:pos + len(batch)])
+                pos += len(batch)
+
+
+class CategorizationService:
+    def __init__(self, holder: RulesHolder, window: float = DEFAULT_BATCH_WINDOW_MS / 1000,
+                 max_batch: int = DEFAULT_MAX_BATCH, reload_interval: float = 1.0):
+        self.holder = holder
+        self.batcher = MicroBatcher(holder, window, max_batch)
+        self.reload_interval = reload_interval
+        self.requests = 0
+        self.started = time.time()
+
+    async def _watch_rules(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                if self.holder.reload_if_changed():
+                    print(f"Regeln neu geladen (Version {self.holder.state[1]})", file=sys.stderr)
+            except (OSError, ValueError) as e:
+                # Halb geschriebene Datei o. Ä.: alten Stand behalten, später erneut versuchen
+                print(f"Regeln konnten nicht geladen werden: {e}", file=sys.stderr)
+
+    async def handle(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if path == "/health":
+            matcher, version = self.holder.state
+            return 200, {"status": "ok", "rules_version": version, "categories": len(matcher.categories),
+                         "requests": self.requests, "batches": self.batcher.batches,
+                         "uptime_s": round(time.time() - self.started, 1)}
+        if path != "/categorize":
+            return 404, {"error": "Unbekannter Pfad"}
+        if method != "POST":
+            return 405, {"error": "Nur POST erlaubt"}
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"error": "Ungültiges JSON"}
+        if isinstance(payload, dict) and isinstance(payload.get("text"), str):
+            labels = await self.batcher.submit([payload["text"]])
+            return 200, {"category": labels[0], "rules_version": self.holder.state[1]}
+        if isinstance(payload, dict) and isinstance(payload.get("texts"), list):
+            texts = [t if isinstance(t, str) else str(t) for t in payload["texts"]]
+            labels = await self.batcher.submit(texts) if texts else []
+            return 200, {"categories": labels, "rules_version": self.holder.state[1]}
+        return 400, {"error": "Erwartet {\"text\": ...} oder {\"texts\": [...]}"}
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, result = 400, {"error": "Ungültige Content-Length"}
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, result = 413, {"error": "Anfrage zu groß"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    self.requests += 1
+                    try:
+                        status, result = await self.handle(method.upper(), target.split("?")[0], body)
+                    except Exception as e:
+                        status, result = 500, {"error": str(e)}
+                    keep_alive = (headers.get("connection", "").lower() != "close"
+                                  and version.upper() == "HTTP/1.1")
+                data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self._serve_connection, host, port)
+        tasks = [asyncio.create_task(self.batcher.run()), asyncio.create_task(self._watch_rules())]
+        print(f"Kategorisierungsdienst läuft auf http://{host}:{port} "
+              f"(Regel-Version {self.holder.state[1]})", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m service", description="HTTP-Dienst zur Feedback-Kategorisierung.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rules", type=Path, default=RULES_PATH, help="Regeldatei (JSON)")
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                        help="Wartezeit, um Anfragen zu einem Batch zusammenzufassen")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Maximale Texte pro Batch")
+    parser.add_argument("--reload-interval", type=float, default=1.0, help="Prüfintervall der Regeldatei (s)")
+    parser.add_argument("--no-normalize", action="store_true", help="Texte nicht normalisieren")
+    args = parser.parse_args(argv)
+
+    holder = RulesHolder(args.rules, normalize=not args.no_normalize)
+    service = CategorizationService(holder, args.batch_window_ms / 1000, args.max_batch, args.reload_interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
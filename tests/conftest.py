@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Module liegen flach im Repo-Wurzelverzeichnis (wie für "streamlit run app.py")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,109 @@
+import json
+import time
+import urllib.request
+
+import pytest
+
+pytest.importorskip("github")
+
+import github_sync
+from fake_github import serve
+from github_sync import CONFLICT, FAILED, RETRYING, SYNCED, GitHubSync
+
+REPO = "demo/feedback"
+PATH = "data/custom_rules.json"
+
+
+@pytest.fixture
+def fake():
+    server, state = serve(port=0)
+    state.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def make_sync(fake, **kwargs) -> GitHubSync:
+    kwargs.setdefault("debounce", 0.2)
+    kwargs.setdefault("backoff", 0.01)
+    kwargs.setdefault("max_backoff", 0.05)
+    return GitHubSync("fake-token", REPO, path=PATH, base_url=fake.url, **kwargs)
+
+
+def remote_rules(fake) -> dict:
+    return json.loads(fake.files[(REPO, PATH)][0])
+
+
+def wait_for_state(sync: GitHubSync, state: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while sync.status.state != state:
+        assert time.monotonic() < deadline, f"Status {sync.status.state!r} statt {state!r}"
+        time.sleep(0.01)
+
+
+def test_rapid_submits_are_coalesced_into_one_commit(fake):
+    sync = make_sync(fake)
+    for i in range(5):
+        sync.submit({"Login": ["passwort"], "Neu": [f"begriff{i}"]})
+    status = sync.flush()
+    assert status.state == SYNCED
+    assert status.coalesced == 5
+    assert len(fake.commits) == 1
+    assert remote_rules(fake)["Neu"] == ["begriff4"]
+
+
+def test_debounce_pushes_without_flush(fake):
+    sync = make_sync(fake, debounce=0.1)
+    sync.submit({"Login": ["passwort"]})
+    sync.submit({"Login": ["passwort", "pin"]})
+    wait_for_state(sync, SYNCED)
+    assert len(fake.commits) == 1
+    assert remote_rules(fake) == {"Login": ["passwort", "pin"]}
+
+
+def test_remote_edit_causes_conflict_until_forced(fake):
+    sync = make_sync(fake)
+    sync.submit({"Login": ["passwort"]})
+    assert sync.flush().state == SYNCED
+
+    request = urllib.request.Request(f"{fake.url}/_fake/edit/{PATH}", data=b"{}", method="POST")
+    urllib.request.urlopen(request).close()
+    commits_before = len(fake.commits)
+
+    sync.submit({"Login": ["passwort", "pin"]})
+    status = sync.flush()
+    assert status.state == CONFLICT
+    assert len(fake.commits) == commits_before  # nichts überschrieben
+
+    sync.submit({"Login": ["passwort", "pin"]}, force=True)
+    assert sync.flush().state == SYNCED
+    assert len(fake.commits) == commits_before + 1
+    assert remote_rules(fake) == {"Login": ["passwort", "pin"]}
+
+
+def test_server_errors_are_retried_until_synced(fake):
+    fake.fail_rate = 1.0
+    sync = make_sync(fake, max_retries=100)
+    sync.submit({"Login": ["passwort"]})
+    wait_for_state(sync, RETRYING)
+    fake.fail_rate = 0.5
+    status = sync.flush()
+    assert status.state == SYNCED
+    assert status.attempts > 1
+    assert len(fake.commits) == 1
+
+
+def test_gives_up_after_max_retries(fake):
+    fake.fail_rate = 1.0
+    sync = make_sync(fake, max_retries=3)
+    sync.submit({"Login": ["passwort"]})
+    status = sync.flush()
+    assert status.state == FAILED
+    assert status.attempts == 3
+    assert not fake.commits
+
+
+def test_disabled_without_token():
+    sync = GitHubSync(None, REPO)
+    sync.submit({"Login": ["passwort"]})
+    assert sync.status.state == github_sync.DISABLED
@@ -0,0 +1,43 @@
+import io
+
+import pandas as pd
+import pytest
+
+from ingest import iter_chunks
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def workbook_bytes(rows: list[list], formatted_until: int = 0) -> bytes:
+    from openpyxl.styles import Font
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Feedback", "Note"])
+    for row in rows:
+        ws.append(row)
+    # Formatierte, aber leere Zeilen bis ``formatted_until`` (wie nach Kopieren/Löschen in Excel)
+    for r in range(len(rows) + 2, formatted_until + 1):
+        ws.cell(r, 1).font = Font(bold=True)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [2, 3, 50_000])
+def test_xlsx_trailing_formatted_rows_are_dropped_like_read_excel(chunk_size):
+    data = workbook_bytes([["Login geht nicht", 1], [None, None], ["App stürzt ab", None], ["TAN fehlt", 3]],
+                          formatted_until=59)
+    expected = pd.read_excel(io.BytesIO(data))
+    chunks = list(iter_chunks(io.BytesIO(data), "upload.xlsx", chunk_size=chunk_size))
+    assert all(len(c) <= chunk_size for c in chunks)
+    result = pd.concat(chunks, ignore_index=True)
+    assert len(result) == len(expected) == 4
+    # Leerzeilen zwischen gefüllten Zeilen bleiben erhalten
+    pd.testing.assert_series_equal(result["Feedback"].astype(object), expected["Feedback"].astype(object),
+                                   check_dtype=False)
+
+
+def test_xlsx_only_header():
+    data = workbook_bytes([], formatted_until=20)
+    assert sum(len(c) for c in iter_chunks(io.BytesIO(data), "upload.xlsx")) == len(pd.read_excel(io.BytesIO(data)))
@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from learning import LOG_COLUMNS, _ngrams, _tokenize, log_accepted, mine_candidates
+from matcher import FALLBACK_CATEGORY
+
+RULES = {"Zahlung": ["überweisung"], "Login": ["passwort"]}
+
+
+def mine(rows: list[tuple[str, str, int]], rules=RULES, **kwargs) -> pd.DataFrame:
+    """``rows``: (Text, Kategorie, Anzahl); Schwellen standardmäßig aus."""
+    feedback = pd.Series([text for text, _, count in rows for _ in range(count)])
+    labels = pd.Series([cat for _, cat, count in rows for _ in range(count)])
+    kwargs = {"min_support": 1, "min_labeled": 1, "min_precision": 0.0, **kwargs}
+    return mine_candidates(feedback, labels, rules, **kwargs)
+
+
+def test_ngrams_stay_within_rows():
+    ids, rows, vocab = _tokenize(["alter drucker", "kaputt wieder", "neuer drucker", "kaputt jetzt"])
+    for n, gram, valid in _ngrams(ids, rows, 3):
+        # Jedes gültige N-Gramm beginnt und endet in derselben Zeile
+        starts = valid.nonzero()[0]
+        assert (rows[starts] == rows[starts + n - 1]).all()
+    assert len(vocab) == 6
+
+    found = mine([
+        ("alter drucker", FALLBACK_CATEGORY, 1),
+        ("kaputt wieder", FALLBACK_CATEGORY, 1),
+        ("neuer drucker", "Hardware", 1),
+        ("kaputt jetzt", "Hardware", 1),
+    ], rules={"Hardware": ["maus"]})
+    assert {"drucker", "kaputt"} <= set(found["Begriff"])
+    assert "drucker kaputt" not in set(found["Begriff"])
+
+
+THRESHOLD_ROWS = [
+    ("rechnung falsch", FALLBACK_CATEGORY, 5),
+    ("rechnung bezahlt", "Zahlung", 3),
+    ("rechnung passwort", "Login", 1),
+]
+
+
+def test_candidate_scores():
+    found = mine(THRESHOLD_ROWS, min_labeled=2).set_index("Begriff")
+    assert found.index.tolist() == ["rechnung"]
+    row = found.loc["rechnung"]
+    assert (row["Kategorie"], row["Abdeckung"], row["Präzision"], row["Belege"]) == ("Zahlung", 5, 0.75, 3)
+    assert row["Erwarteter Gewinn"] == pytest.approx(3.8)
+
+
+@pytest.mark.parametrize("kwargs, kept", [
+    ({"min_support": 5}, True),
+    ({"min_support": 6}, False),
+    ({"min_labeled": 4}, True),
+    ({"min_labeled": 5}, False),
+    ({"min_precision": 0.75}, True),
+    ({"min_precision": 0.76}, False),
+])
+def test_thresholds(kwargs, kept):
+    found = mine(THRESHOLD_ROWS, **kwargs)
+    assert ("rechnung" in set(found["Begriff"])) is kept
+
+
+def test_existing_terms_and_stopwords_are_excluded():
+    found = mine([
+        ("das geht nicht", FALLBACK_CATEGORY, 5),
+        ("das geht nicht bezahlt", "Zahlung", 3),
+    ], rules={"Zahlung": ["Geht nicht"]})
+    # "das"/"nicht" nur Stoppwörter, "geht nicht" steht schon in den Regeln
+    assert set(found["Begriff"]) == {"geht", "das geht", "das geht nicht"}
+
+
+def test_surface_form_keeps_original_spelling():
+    found = mine([
+        ("Meine E-Mail kommt nicht an", FALLBACK_CATEGORY, 5),
+        ("E-Mail Adresse ändern", "Konto", 3),
+        ("Straße falsch", FALLBACK_CATEGORY, 2),
+        ("Straße ändern", "Konto", 2),
+    ], rules={"Konto": ["profil"]})
+    terms = set(found["Begriff"])
+    assert {"E-Mail", "Mail", "Straße"} <= terms
+    assert not {"e mail", "strasse"} & terms
+
+
+def test_log_accepted_writes_header_once(tmp_path):
+    path = tmp_path / "logs" / "regeln.csv"
+    accepted = pd.DataFrame({"Kategorie": ["Zahlung"], "Begriff": ["Rechnung"],
+                             "Abdeckung": [5], "Präzision": [0.75]})
+    log_accepted(accepted.iloc[:0], path)
+    assert not path.exists()
+    log_accepted(accepted, path)
+    log_accepted(accepted, path, source="Test")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ",".join(LOG_COLUMNS)
+    assert lines.count(lines[0]) == 1
+    log = pd.read_csv(path)
+    assert log.columns.tolist() == LOG_COLUMNS
+    assert log["Begriff"].tolist() == ["Rechnung", "Rechnung"]
+    assert log["Quelle"].tolist() == ["Regeln lernen", "Test"]
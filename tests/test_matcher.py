@@ -0,0 +1,145 @@
+import copy
+import random
+
+import pandas as pd
+import pytest
+
+from categorizer import DEFAULT_RULES
+from matcher import RuleMatcher, categorize_regex, compile_regex_patterns
+
+BASE_RULES = {
+    "Login": ["login", "passwort", "Anmeldung fehlgeschlagen"],
+    "App": ["app", "app absturz", "Update"],
+    "Fehler": ["fehler", "bug", "passwort"],  # "passwort" auch in Login (Priorität)
+    "Zahlung": ["rate", "Überweisung", "c++"],
+}
+
+TEXTS = [
+    "Login geht nicht, Passwort vergessen",
+    "Die App stürzt ab: App Absturz nach dem UPDATE",
+    "Fehler beim Login",
+    "Anmeldung fehlgeschlagen!!",
+    "Überweisung und Rate – beides kaputt",
+    "Ich programmiere in C++ und finde einen Bug",
+    "approximately nothing",  # kein Wort-Treffer für "app"
+    "Passwort",
+    "neuer Begriff: kontosperre",
+    "",
+    None,
+    float("nan"),
+]
+
+EDITS = {
+    "add_term": lambda r: {**r, "App": [*r["App"], "kontosperre"]},
+    "add_existing_term_lower_priority": lambda r: {**r, "Zahlung": [*r["Zahlung"], "login"]},
+    "remove_term": lambda r: {**r, "App": ["app", "Update"]},
+    "remove_shared_term_from_first": lambda r: {**r, "Login": ["login", "Anmeldung fehlgeschlagen"]},
+    "move_term": lambda r: {**r, "Login": ["login"], "Fehler": [*r["Fehler"], "Anmeldung fehlgeschlagen"]},
+    "add_category": lambda r: {**r, "Konto": ["kontosperre", "konto"]},
+    "remove_category": lambda r: {k: v for k, v in r.items() if k != "App"},
+    "empty_category": lambda r: {**r, "App": []},
+    "reorder": lambda r: dict(reversed(list(r.items()))),
+    "swap_two": lambda r: {"App": r["App"], "Login": r["Login"], "Fehler": r["Fehler"], "Zahlung": r["Zahlung"]},
+    "no_change": lambda r: copy.deepcopy(r),
+}
+
+
+def score_view(matcher: RuleMatcher, texts: list) -> list:
+    """Vergleichbare Sicht auf score(): Begriff-IDs sind nach with_rules() andere als bei Neubau."""
+    scores = matcher.score(texts)
+    rows = []
+    for i in range(len(scores)):
+        lo, hi = scores.cat_indptr[i], scores.cat_indptr[i + 1]
+        cats = {scores.categories[c]: int(n) for c, n in zip(scores.cat_ids[lo:hi], scores.cat_counts[lo:hi])}
+        primary = scores.categories[scores.primary[i]] if scores.primary[i] >= 0 else None
+        rows.append((scores.matched_terms(i), cats, primary, round(float(scores.confidence[i]), 6)))
+    return rows
+
+
+def assert_equivalent(patched: RuleMatcher, fresh: RuleMatcher, texts: list) -> None:
+    assert patched.categories == fresh.categories
+    assert patched.categorize(texts) == fresh.categorize(texts)
+    assert score_view(patched, texts) == score_view(fresh, texts)
+    assert list(patched.score(texts).primary_labels()) == list(fresh.score(texts).primary_labels())
+
+
+@pytest.mark.parametrize("edit", list(EDITS))
+def test_with_rules_matches_fresh_matcher(edit):
+    new_rules = EDITS[edit](BASE_RULES)
+    assert_equivalent(RuleMatcher(BASE_RULES).with_rules(new_rules), RuleMatcher(new_rules), TEXTS)
+
+
+@pytest.mark.parametrize("edit", list(EDITS))
+def test_with_rules_leaves_original_unchanged(edit):
+    matcher = RuleMatcher(BASE_RULES)
+    before_categorize = matcher.categorize(TEXTS)
+    before_scores = score_view(matcher, TEXTS)
+    matcher.with_rules(EDITS[edit](BASE_RULES))
+    assert matcher.categorize(TEXTS) == before_categorize
+    assert score_view(matcher, TEXTS) == before_scores
+    assert_equivalent(matcher, RuleMatcher(BASE_RULES), TEXTS)
+
+
+def test_chained_edits_match_fresh_matcher():
+    matcher, rules = RuleMatcher(BASE_RULES), BASE_RULES
+    for edit in ["add_term", "remove_shared_term_from_first", "add_category", "move_term", "remove_term"]:
+        rules = EDITS[edit](rules)
+        matcher = matcher.with_rules(rules)
+        assert_equivalent(matcher, RuleMatcher(rules), TEXTS)
+
+
+def test_random_edits_on_default_rules():
+    rnd = random.Random(7)
+    all_terms = sorted({t for terms in DEFAULT_RULES.values() for t in terms})
+    texts = [" ".join(rnd.sample(all_terms, 3)) + " und noch etwas Text" for _ in range(300)]
+    rules = copy.deepcopy(DEFAULT_RULES)
+    matcher = RuleMatcher(rules)
+    for _ in range(25):
+        rules = copy.deepcopy(rules)
+        cat = rnd.choice(list(rules))
+        if rules[cat] and rnd.random() < 0.5:
+            rules[cat].remove(rnd.choice(rules[cat]))
+        else:
+            rules[cat].append(rnd.choice(all_terms))
+        previous = matcher
+        previous_labels = previous.categorize(texts)
+        matcher = matcher.with_rules(rules)
+        assert_equivalent(matcher, RuleMatcher(rules), texts)
+        assert previous.categorize(texts) == previous_labels
+
+
+# --- Gleiche Labels wie der bisherige Regex-Pfad ---
+EDGE_RULES = {
+    **DEFAULT_RULES,
+    "Sonderfälle": ["c++", "e-mail:", "mTAN", "straße", "İstanbul", "foo_bar", "(beta)", "-"],
+}
+
+EDGE_TEXTS = [
+    None, float("nan"), "", " ", "?!…", "---", "...", "___",
+    "login_fehler", "foo_bar", "foo bar", "foo_bar_baz",
+    "İstanbul", "istanbul", "İSTANBUL", "STRASSE", "Straße", "STRAẞE",
+    "LOGIN GEHT NICHT", "MTAN kommt nicht", "mTAN", "mtan", "tan", "TAN-Generator",
+    "Ich schreibe C++", "c++11", "c+", "E-Mail: kaputt", "e-mail", "E-Mail:x",
+    "App (beta) stürzt ab", "(beta)", "a - b", "a-b", "-", "über-app", "app-absturz",
+    "Zeilen\numbruch und Login", "\tTabs\tund Passwort", "Emoji 😀 Login 😀",
+]
+
+
+def _fuzz_texts(rules: dict[str, list[str]], n: int, seed: int = 3) -> list[str]:
+    rnd = random.Random(seed)
+    terms = [t for ts in rules.values() for t in ts]
+    fillers = ["und", "die", "app", "leider", "_", "-", ".", ",", "!", "ß", "İ", "x", "123"]
+    seps = [" ", "", "-", "_", ", ", "!", "\n", "/"]
+    texts = []
+    for _ in range(n):
+        parts = [rnd.choice(terms) if rnd.random() < 0.4 else rnd.choice(fillers) for _ in range(rnd.randint(1, 6))]
+        parts = [p.upper() if rnd.random() < 0.2 else p.capitalize() if rnd.random() < 0.2 else p for p in parts]
+        texts.append("".join(p + rnd.choice(seps) for p in parts))
+    return texts
+
+
+@pytest.mark.parametrize("rules", [DEFAULT_RULES, EDGE_RULES], ids=["default", "edge"])
+def test_categorize_matches_regex_reference(rules):
+    texts = EDGE_TEXTS + _fuzz_texts(rules, 3000)
+    expected = categorize_regex(pd.Series(texts, dtype=object), compile_regex_patterns(rules))
+    assert RuleMatcher(rules).categorize(texts) == expected.tolist()
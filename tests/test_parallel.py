@@ -0,0 +1,53 @@
+import pytest
+
+from matcher import RuleMatcher
+from parallel import ParallelCategorizer, WorkerPool, shared_pool
+
+RULES = {"Login": ["login", "passwort"], "App": ["app", "absturz"]}
+TEXTS = ["Login geht nicht", "App Absturz", "nichts", "Passwort und App", None] * 20
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(2)
+    yield pool
+    pool.close()
+
+
+def test_sessions_with_different_rules_share_one_pool(pool):
+    edited = {**RULES, "Neu": ["nichts"], "Login": ["login"]}
+    first = ParallelCategorizer(RULES, min_rows=0, pool=pool)
+    second = ParallelCategorizer(edited, min_rows=0, pool=pool)
+    for _ in range(2):  # abwechselnd: Worker halten beide Versionen vor
+        assert first.categorize(TEXTS) == RuleMatcher(RULES).categorize(TEXTS)
+        assert second.categorize(TEXTS) == RuleMatcher(edited).categorize(TEXTS)
+    first.close()  # geteilter Pool wird vom Categorizer nicht beendet
+    assert not pool.closed
+    assert second.categorize(TEXTS) == RuleMatcher(edited).categorize(TEXTS)
+
+
+def test_closed_pool_is_not_restarted():
+    categorizer = ParallelCategorizer(RULES, workers=2, min_rows=0)
+    categorizer.categorize(TEXTS)
+    categorizer.close()
+    with pytest.raises(RuntimeError):
+        categorizer.categorize(TEXTS)
+
+
+def test_shared_pool_per_worker_count():
+    assert shared_pool(2) is shared_pool(2)
+    assert shared_pool(1) is not shared_pool(2)
+
+
+def test_worker_matchers_are_patched_from_the_latest_version():
+    import parallel
+
+    parallel._worker_matchers.clear()
+    first = parallel._worker_matcher("v1", RULES)
+    edited = {**RULES, "App": ["app"]}
+    second = parallel._worker_matcher("v2", edited)
+    assert second.version == first.version + 1
+    assert second.category_versions == {"Login": first.version, "App": second.version}
+    assert second.categorize(TEXTS) == RuleMatcher(edited).categorize(TEXTS)
+    assert parallel._worker_matcher("v1", RULES) is first
+    parallel._worker_matchers.clear()
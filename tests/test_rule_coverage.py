@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from matcher import FALLBACK_CATEGORY, RuleMatcher
+from rule_coverage import STATUS_ACTIVE, STATUS_DEAD, STATUS_PARTIAL, STATUS_SHADOWED, TermIndex, analyze
+
+RULES = {
+    "Login": ["fehlermeldung", "login"],
+    "Fehler": ["fehlermeldung", "fehler", "bug", "quantencomputer"],
+}
+# Doppelte Texte werden wie in der App über Gewichte gezählt
+FEEDBACK = (["Fehlermeldung beim Login"] * 3 + ["Fehler und Bug"] + ["Login klappt"] * 2
+            + ["nichts", "Fehlermeldung"] + ["Bug beim Login"] * 2)
+
+
+def build():
+    matcher = RuleMatcher(RULES)
+    codes, uniques = pd.factorize(pd.Series(FEEDBACK))
+    index = TermIndex.build(matcher.score(uniques), np.bincount(codes, minlength=len(uniques)))
+    return matcher, list(uniques), index
+
+
+def test_term_index():
+    matcher, uniques, index = build()
+    assert index.weights.tolist() == [3, 1, 2, 1, 1, 2]
+    # Login gewinnt überall dort, wo auch Fehler trifft
+    assert index.winner.tolist() == [0, 1, 0, -1, 0, 0]
+    rows = {term: sorted(uniques[r] for r in index.rows_for(i)) for i, term in enumerate(index.terms)}
+    assert rows["fehlermeldung"] == ["Fehlermeldung", "Fehlermeldung beim Login"]
+    assert rows["bug"] == ["Bug beim Login", "Fehler und Bug"]
+    assert rows["quantencomputer"] == []
+
+
+def test_term_statuses_and_weighted_hits():
+    matcher, _, index = build()
+    terms = analyze(matcher, index).terms
+    got = {(cat, term): rest for cat, term, *rest in terms.itertuples(index=False)}
+    assert got == {
+        ("Login", "fehlermeldung"): [4, 4, 0, STATUS_ACTIVE, "Fehler"],
+        ("Login", "login"): [7, 7, 0, STATUS_ACTIVE, ""],
+        ("Fehler", "fehlermeldung"): [4, 0, 4, STATUS_SHADOWED, "Login"],
+        ("Fehler", "fehler"): [1, 1, 0, STATUS_ACTIVE, ""],
+        ("Fehler", "bug"): [3, 1, 2, STATUS_PARTIAL, ""],
+        ("Fehler", "quantencomputer"): [0, 0, 0, STATUS_DEAD, ""],
+    }
+
+
+def test_overlap_and_shadowing_matrices():
+    matcher, _, index = build()
+    report = analyze(matcher, index)
+    assert report.overlap.loc[["Login", "Fehler"], ["Login", "Fehler"]].values.tolist() == [[8, 6], [6, 7]]
+    # Zeile A, Spalte B: A gewinnt Zeilen, in denen auch B trifft
+    assert report.shadowing.loc[["Login", "Fehler"], ["Login", "Fehler"]].values.tolist() == [[0, 6], [0, 0]]
+    cats = report.categories.loc[["Login", "Fehler", FALLBACK_CATEGORY]]
+    assert cats["Zeilen mit Treffer"].tolist() == [8, 7, 1]
+    assert cats["Zugeordnet"].tolist() == [8, 1, 1]
+    assert cats["An frühere Kategorie verloren"].tolist() == [0, 6, 0]
+    assert cats["Zugeordnet"].sum() == len(FEEDBACK)
+
+
+def test_without_overlaps():
+    matcher = RuleMatcher({"A": ["alpha"], "B": ["beta"]})
+    report = analyze(matcher, TermIndex.build(matcher.score(["alpha", "beta", "beta", "gamma"])))
+    assert report.terms["Status"].tolist() == [STATUS_ACTIVE, STATUS_ACTIVE]
+    assert report.overlap.values.tolist() == [[1, 0], [0, 2]]
+    assert report.shadowing.values.sum() == 0